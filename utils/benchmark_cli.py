@@ -0,0 +1,202 @@
+# utils/benchmark_cli.py
+"""
+Headless benchmark runner. Reuses the app's query executors without starting the UI,
+so benchmark suites can run from cron/CI against a local Cassandra/MongoDB:
+
+    python -m utils.benchmark_cli scenarios/nightly.json --output results.json
+    python -m utils.benchmark_cli scenarios/nightly.json --format csv --output results.csv
+    python -m utils.benchmark_cli scenarios/nightly.json --store   # also append to the app's Benchmark History
+
+See scenarios/nightly.json for the scenario file format (YAML is accepted when PyYAML is installed).
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timezone
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from utils.benchmark_stats import measure_repeated, summarize_latencies
+from utils.benchmark_store import DEFAULT_STORE_PATH, record_benchmark_run
+from utils.cassandra_utils import build_cassandra_cluster, load_cassandra_config
+from utils.load_generator import run_closed_loop, run_open_loop, summarize_load_test
+from utils.query_executors import (
+    cassandra_query_operation, mongodb_query_operation, run_cassandra_query, run_mongodb_query,
+    fetch_employee_performance, fetch_combined_performance
+)
+from utils.employee_dimension import EmployeeDimension
+
+DEFAULT_MONGO_DB_NAME = "grocery_store_db"
+DEFAULT_SETTINGS = {"iterations": 20, "warmup": 3, "prepared": False}
+
+def load_scenario(path):
+    with open(path) as scenario_file:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("PyYAML is required for YAML scenario files (pip install pyyaml), or use JSON.")
+            return yaml.safe_load(scenario_file)
+        return json.load(scenario_file)
+
+class Connections:
+    """Opens each database lazily, only if a benchmark in the scenario needs it."""
+    def __init__(self, mongo_db_name):
+        self.mongo_db_name = mongo_db_name
+        self._cassandra_cluster, self._cassandra_session, self._mongo_client = None, None, None
+        self._employee_dimension = None
+
+    @property
+    def cassandra(self):
+        if self._cassandra_session is None:
+            config = load_cassandra_config()
+            self._cassandra_cluster = build_cassandra_cluster(config)
+            self._cassandra_session = self._cassandra_cluster.connect(config["keyspace"])
+        return self._cassandra_session
+
+    @property
+    def mongo_db(self):
+        if self._mongo_client is None:
+            conn_str = os.getenv('CONNECTION_STRING')
+            if not conn_str: raise RuntimeError("CONNECTION_STRING is not set (environment or .env).")
+            self._mongo_client = MongoClient(conn_str, serverSelectionTimeoutMS=5000)
+        return self._mongo_client[self.mongo_db_name]
+
+    @property
+    def employee_dimension(self):
+        # Same in-memory employee cache as the app's Combined Analytics page
+        if self._employee_dimension is None:
+            self._employee_dimension = EmployeeDimension(self.mongo_db["karyawan"], snapshot_path=os.getenv("EMPLOYEE_DIMENSION_SNAPSHOT") or None)
+        return self._employee_dimension
+
+    def close(self):
+        if self._cassandra_cluster is not None: self._cassandra_cluster.shutdown()
+        if self._mongo_client is not None: self._mongo_client.close()
+
+def _parse_date(value):
+    return value if isinstance(value, date) else datetime.strptime(str(value), '%Y-%m-%d').date()
+
+def build_operation(benchmark, connections):
+    """Returns (zero-argument operation, single-run function returning (rows, seconds), target label)."""
+    engine = benchmark["engine"]
+    if engine == "cassandra":
+        session, query, prepared = connections.cassandra, benchmark["query"], benchmark["prepared"]
+        single_run = lambda: _rows_and_time(run_cassandra_query(session, query, use_prepared=prepared))
+        return cassandra_query_operation(session, query, prepared), single_run, benchmark.get("target", query)
+    if engine == "mongodb":
+        db, collection = connections.mongo_db, benchmark["collection"]
+        operation_type, params = benchmark.get("operation", "Find"), benchmark.get("params", {})
+        single_run = lambda: _rows_and_time(run_mongodb_query(db, collection, operation_type, params))
+        return mongodb_query_operation(db, collection, operation_type, params), single_run, collection
+    if engine == "analytics":
+        start_date, end_date = _parse_date(benchmark["start_date"]), _parse_date(benchmark["end_date"])
+        def analytics_operation():
+            combined_df, _ = fetch_combined_performance(
+                lambda: fetch_employee_performance(connections.cassandra, start_date, end_date)[0],
+                connections.employee_dimension
+            )
+            return combined_df
+        def single_run():
+            start_time = time.perf_counter()
+            combined_df = analytics_operation()
+            return len(combined_df), time.perf_counter() - start_time
+        return analytics_operation, single_run, f"combined {start_date}..{end_date}"
+    raise ValueError(f"Unknown engine '{engine}' (expected cassandra, mongodb or analytics).")
+
+def _rows_and_time(df_and_duration):
+    df, duration = df_and_duration
+    return len(df), duration
+
+def run_benchmark(benchmark, connections):
+    """Runs one scenario entry: repeated measurement by default, a load test when it has a `load` section."""
+    operation, single_run, target = build_operation(benchmark, connections)
+    rows, first_run_s = single_run()
+    result = {"name": benchmark["name"], "engine": benchmark["engine"], "target": target, "rows": rows, "first_run_s": first_run_s}
+    load = benchmark.get("load")
+    if load:
+        if load.get("mode", "closed") == "closed":
+            samples, elapsed = run_closed_loop(operation, int(load.get("concurrency", 8)), float(load.get("duration_s", 10)))
+        else:
+            samples, elapsed = run_open_loop(operation, float(load["target_qps"]), float(load.get("duration_s", 10)), int(load.get("concurrency", 64)))
+        summary = summarize_load_test(samples, elapsed)
+        result.update({"kind": f"load_{load.get('mode', 'closed')}", **summary})
+    else:
+        samples = measure_repeated(operation, int(benchmark["iterations"]), int(benchmark["warmup"]))
+        result.update({"kind": "repeated", **summarize_latencies(samples), "samples_s": samples})
+    return result
+
+def run_scenario(scenario):
+    defaults = {**DEFAULT_SETTINGS, **scenario.get("defaults", {})}
+    connections = Connections(scenario.get("mongo_db", DEFAULT_MONGO_DB_NAME))
+    results = []
+    try:
+        for benchmark in scenario.get("benchmarks", []):
+            benchmark = {**defaults, **benchmark}
+            print(f"Running '{benchmark['name']}' ({benchmark['engine']})...", file=sys.stderr)
+            try:
+                results.append(run_benchmark(benchmark, connections))
+            except Exception as e:
+                results.append({"name": benchmark["name"], "engine": benchmark["engine"], "error": f"{type(e).__name__}: {e}"})
+                print(f"  failed: {e}", file=sys.stderr)
+    finally:
+        connections.close()
+    return results
+
+def store_results(results, benchmarks, store_path):
+    """Appends successful results to the SQLite benchmark store read by the app's Benchmark History page."""
+    settings_by_name = {benchmark["name"]: benchmark for benchmark in benchmarks}
+    for result in results:
+        if "error" in result: continue
+        benchmark = settings_by_name.get(result["name"], {})
+        record_benchmark_run(
+            engine=result["engine"], target=result["target"], query_text=benchmark.get("query", benchmark.get("params", result["target"])),
+            samples=result.get("samples_s"), summary=None if "samples_s" in result else result,
+            kind=result["kind"], source="cli", row_count=result["rows"],
+            parameters={key: value for key, value in benchmark.items() if key not in ("query", "engine")},
+            driver_settings={key: value for key, value in load_cassandra_config().items() if key not in ("username", "password")} if result["engine"] != "mongodb" else {},
+            store_path=store_path
+        )
+
+def write_results(results, output_format, output_file):
+    run_at = datetime.now(timezone.utc).isoformat()
+    if output_format == "json":
+        json.dump({"run_at": run_at, "results": results}, output_file, indent=2, default=str)
+        output_file.write("\n")
+        return
+    # CSV: one row per benchmark, raw samples left out
+    rows = [{"run_at": run_at, **{key: value for key, value in result.items() if key != "samples_s"}} for result in results]
+    fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+    writer = csv.DictWriter(output_file, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Cassandra/MongoDB benchmark scenario headlessly.")
+    parser.add_argument("scenario", help="Path to a JSON (or YAML) scenario file.")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="Output format (default: json).")
+    parser.add_argument("--output", help="Output file (default: stdout).")
+    parser.add_argument("--env-file", help="Environment file with CONNECTION_STRING and CASSANDRA_* settings. Its values override the "
+                                           "process environment (default: ./.env, which does not override it).")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_PATH, help=f"Also save results to the benchmark history store (default path: {DEFAULT_STORE_PATH}).")
+    args = parser.parse_args(argv)
+
+    # An explicitly chosen env file must win, or a nightly job could silently benchmark another cluster
+    load_dotenv(args.env_file or ".env", override=args.env_file is not None)
+    scenario = load_scenario(args.scenario)
+    results = run_scenario(scenario)
+    if args.store:
+        defaults = {**DEFAULT_SETTINGS, **scenario.get("defaults", {})}
+        store_results(results, [{**defaults, **benchmark} for benchmark in scenario.get("benchmarks", [])], args.store)
+    if args.output:
+        with open(args.output, "w", newline="") as output_file:
+            write_results(results, args.format, output_file)
+    else:
+        write_results(results, args.format, sys.stdout)
+    return 1 if any("error" in result for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# utils/benchmark_stats.py
+import time
+import numpy as np
+import pandas as pd
+
+def measure_repeated(operation, iterations: int, warmup: int = 0):
+    """
+    Calls `operation` (a zero-argument callable that runs the query and drains its
+    results) `warmup` times without timing it, then `iterations` times with timing.
+    Returns the measured latencies in seconds.
+    """
+    for _ in range(warmup):
+        operation()
+    samples = []
+    for _ in range(iterations):
+        start_time = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start_time)
+    return samples
+
+def summarize_latencies(samples):
+    """Summary statistics (in seconds) and sequential throughput for a list of latency samples."""
+    if not samples:
+        return {}
+    latencies = np.asarray(samples, dtype=float)
+    total_time = latencies.sum()
+    return {
+        "iterations": int(latencies.size),
+        "min": float(latencies.min()),
+        "median": float(np.median(latencies)),
+        "mean": float(latencies.mean()),
+        "p95": float(np.percentile(latencies, 95)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": float(latencies.max()),
+        "stddev": float(latencies.std(ddof=1)) if latencies.size > 1 else 0.0,
+        "throughput_ops": float(latencies.size / total_time) if total_time > 0 else 0.0,
+    }
+
+def summary_table(samples_by_label):
+    """One column per label, one row per statistic, latencies converted to milliseconds."""
+    table = {}
+    for label, samples in samples_by_label.items():
+        summary = summarize_latencies(samples)
+        if not summary: continue
+        table[label] = {
+            "Iterations": summary["iterations"],
+            "Min (ms)": summary["min"] * 1000,
+            "Median (ms)": summary["median"] * 1000,
+            "Mean (ms)": summary["mean"] * 1000,
+            "p95 (ms)": summary["p95"] * 1000,
+            "p99 (ms)": summary["p99"] * 1000,
+            "Max (ms)": summary["max"] * 1000,
+            "Std Dev (ms)": summary["stddev"] * 1000,
+            "Throughput (ops/s)": summary["throughput_ops"],
+        }
+    return pd.DataFrame(table)
+
+def latency_histogram(samples_by_label, bins: int = 20):
+    """
+    Bins every label's samples on shared edges so the distributions can be drawn
+    side by side. Index is the bin's upper edge in milliseconds, one count column per label.
+    """
+    non_empty = {label: np.asarray(samples) * 1000 for label, samples in samples_by_label.items() if samples}
+    if not non_empty:
+        return pd.DataFrame()
+    edges = np.histogram_bin_edges(np.concatenate(list(non_empty.values())), bins=bins)
+    counts = {label: np.histogram(latencies_ms, bins=edges)[0] for label, latencies_ms in non_empty.items()}
+    index = pd.Index(np.round(edges[1:], 3), name="Latency <= (ms)") # Numeric, so charts keep bin order
+    return pd.DataFrame(counts, index=index)
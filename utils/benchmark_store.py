@@ -0,0 +1,109 @@
+# utils/benchmark_store.py
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import pandas as pd
+from utils.benchmark_stats import summarize_latencies
+
+DEFAULT_STORE_PATH = os.getenv("BENCHMARK_STORE_PATH", "benchmark_results.sqlite")
+
+CREATE_RUNS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS benchmark_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    target TEXT NOT NULL,
+    query_text TEXT,
+    parameters TEXT,
+    driver_settings TEXT,
+    row_count INTEGER,
+    iterations INTEGER,
+    min_s REAL, median_s REAL, mean_s REAL, p95_s REAL, p99_s REAL, max_s REAL, stddev_s REAL,
+    throughput_ops REAL,
+    error_rate REAL,
+    samples TEXT
+)
+"""
+
+RUN_COLUMNS = [
+    "run_at", "source", "kind", "engine", "target", "query_text", "parameters", "driver_settings",
+    "row_count", "iterations", "min_s", "median_s", "mean_s", "p95_s", "p99_s", "max_s", "stddev_s",
+    "throughput_ops", "error_rate", "samples",
+]
+
+@contextmanager
+def _connect(store_path):
+    """Opens the store (creating the table on first use), commits on success and always closes."""
+    connection = sqlite3.connect(store_path or DEFAULT_STORE_PATH)
+    try:
+        connection.execute(CREATE_RUNS_TABLE_SQL)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+def record_benchmark_run(engine, target, query_text, samples=None, summary=None, kind="single", source="app",
+                         parameters=None, driver_settings=None, row_count=None, store_path=None):
+    """
+    Persists one benchmark run. Pass raw latency `samples` (seconds) and the summary is
+    computed here, or pass a precomputed `summary` (e.g. from a load test) with the same keys
+    as benchmark_stats.summarize_latencies. Returns the new run id.
+    """
+    summary = summary or summarize_latencies(samples or [])
+    row = {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": source, "kind": kind, "engine": engine, "target": target,
+        "query_text": query_text if isinstance(query_text, str) else json.dumps(query_text, default=str),
+        "parameters": json.dumps(parameters or {}, default=str),
+        "driver_settings": json.dumps(driver_settings or {}, default=str),
+        "row_count": row_count,
+        "iterations": summary.get("iterations", summary.get("requests")),
+        "min_s": summary.get("min"), "median_s": summary.get("median", summary.get("p50")), "mean_s": summary.get("mean"),
+        "p95_s": summary.get("p95"), "p99_s": summary.get("p99"), "max_s": summary.get("max"),
+        "stddev_s": summary.get("stddev"), "throughput_ops": summary.get("throughput_ops"),
+        "error_rate": summary.get("error_rate"),
+        "samples": json.dumps(list(samples or [])),
+    }
+    with _connect(store_path) as connection:
+        cursor = connection.execute(
+            f"INSERT INTO benchmark_runs ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join('?' for _ in RUN_COLUMNS)})",
+            [row[column] for column in RUN_COLUMNS]
+        )
+        return cursor.lastrowid
+
+def load_benchmark_runs(store_path=None, engine=None, target=None):
+    """All stored runs (optionally filtered) as a DataFrame ordered by run time."""
+    query, params = "SELECT * FROM benchmark_runs WHERE 1 = 1", []
+    if engine: query += " AND engine = ?"; params.append(engine)
+    if target: query += " AND target = ?"; params.append(target)
+    with _connect(store_path) as connection:
+        df = pd.read_sql_query(query + " ORDER BY run_at, id", connection, params=params)
+    df["run_at"] = pd.to_datetime(df["run_at"])
+    return df
+
+def delete_benchmark_runs(run_ids, store_path=None):
+    with _connect(store_path) as connection:
+        connection.executemany("DELETE FROM benchmark_runs WHERE id = ?", [(int(run_id),) for run_id in run_ids])
+
+def flag_regressions(df_runs, metric="median_s", threshold=0.2, baseline_run_ids=None):
+    """
+    Compares each run's `metric` against a baseline per (engine, target, kind, query_text):
+    the explicitly chosen baseline run when given, otherwise the group's first run.
+    Adds `baseline_s`, `change_pct` and a boolean `regression` column (change above `threshold`).
+    """
+    if df_runs.empty:
+        return df_runs.assign(baseline_s=[], change_pct=[], regression=[])
+    group_keys = [df_runs[key].fillna("") for key in ("engine", "target", "kind", "query_text")]
+    first_in_group = df_runs.groupby(group_keys)[metric].transform("first")
+    chosen_values = df_runs[metric].where(df_runs["id"].isin(list(baseline_run_ids or [])))
+    chosen_in_group = chosen_values.groupby(group_keys).transform("first")
+
+    flagged = df_runs.copy()
+    flagged["baseline_s"] = chosen_in_group.fillna(first_in_group)
+    flagged["change_pct"] = (flagged[metric] / flagged["baseline_s"] - 1) * 100
+    flagged["regression"] = flagged["change_pct"] > threshold * 100
+    return flagged
@@ -0,0 +1,160 @@
+# utils/cassandra_ingest.py
+import time
+import uuid
+from collections import defaultdict
+import pandas as pd
+from cassandra import OperationTimedOut, WriteTimeout
+from cassandra.concurrent import execute_concurrent, execute_concurrent_with_args
+from cassandra.query import BatchStatement, BatchType
+from utils.cassandra_utils import prepare_cached
+
+PLAIN_TABLE = "transaksi_harian"
+INDEXED_TABLE = "indexed_transaksi_harian"
+
+# Bind order of the plain table's INSERT; the indexed INSERT reuses the same tuples reordered
+TRANSAKSI_COLUMNS = ['id_transaksi_harian', 'id_transaksi', 'id_cabang', 'id_karyawan', 'tanggal',
+                     'nama_barang', 'qty', 'harga_barang', 'total_transaksi']
+INDEXED_COLUMNS = ['id_cabang', 'id_karyawan', 'nama_barang', 'tanggal', 'id_transaksi_harian',
+                   'id_transaksi', 'qty', 'harga_barang', 'total_transaksi']
+INDEXED_PARTITION_KEY = ['id_cabang', 'id_karyawan', 'nama_barang']
+
+INSERT_PLAIN_CQL = f"INSERT INTO {PLAIN_TABLE} ({', '.join(TRANSAKSI_COLUMNS)}) VALUES ({', '.join('?' for _ in TRANSAKSI_COLUMNS)})"
+INSERT_INDEXED_CQL = f"INSERT INTO {INDEXED_TABLE} ({', '.join(INDEXED_COLUMNS)}) VALUES ({', '.join('?' for _ in INDEXED_COLUMNS)})"
+
+# Errors worth retrying: the INSERTs are idempotent, so re-sending a timed-out write is safe
+RETRYABLE_ERRORS = (WriteTimeout, OperationTimedOut)
+
+def build_transaksi_params(df_transaksi):
+    """
+    Converts transaksi_harian rows into bind tuples (TRANSAKSI_COLUMNS order) column by column,
+    instead of converting every cell inside an iterrows() loop.
+    """
+    columns = {
+        'id_transaksi_harian': [uuid.UUID(str(value)) for value in df_transaksi['id_transaksi_harian']],
+        'tanggal': pd.to_datetime(df_transaksi['tanggal']).dt.date.tolist(),
+    }
+    for column in ['id_transaksi', 'id_cabang', 'id_karyawan', 'nama_barang']:
+        columns[column] = df_transaksi[column].astype(str).tolist()
+    for column in ['qty', 'harga_barang', 'total_transaksi']:
+        columns[column] = df_transaksi[column].astype('int64').tolist()
+    return list(zip(*(columns[column] for column in TRANSAKSI_COLUMNS)))
+
+def _to_indexed_order(params):
+    positions = [TRANSAKSI_COLUMNS.index(column) for column in INDEXED_COLUMNS]
+    return [tuple(row[position] for position in positions) for row in params]
+
+def _run_with_retries(run_statements, statements, max_retries, retry_backoff_s):
+    """
+    Runs `statements` through `run_statements` (an execute_concurrent call) and re-sends the ones that
+    timed out, backing off between attempts. Returns (failed_statements, retried_count, first_error).
+    """
+    pending, failed_statements, retried_count, first_error = statements, [], 0, None
+    for attempt in range(max_retries + 1):
+        retryable = []
+        for statement, (success, result) in zip(pending, run_statements(pending)):
+            if success: continue
+            first_error = first_error or f"{type(result).__name__}: {result}"
+            if isinstance(result, RETRYABLE_ERRORS) and attempt < max_retries:
+                retryable.append(statement)
+            else:
+                failed_statements.append(statement)
+        if not retryable:
+            break
+        retried_count += len(retryable)
+        pending = retryable
+        time.sleep(retry_backoff_s * (2 ** attempt))
+    return failed_statements, retried_count, first_error
+
+def write_rows(session, cql, params, concurrency=128, max_retries=3, retry_backoff_s=0.5):
+    """
+    Writes one prepared INSERT per tuple in `params`, keeping up to `concurrency` requests in flight.
+    Returns (failed_count, retried_count, first_error).
+    """
+    prepared = prepare_cached(session, cql)
+    run_statements = lambda pending: execute_concurrent_with_args(
+        session, prepared, pending, concurrency=concurrency, raise_on_first_error=False
+    )
+    failed_params, retried_count, first_error = _run_with_retries(run_statements, params, max_retries, retry_backoff_s)
+    return len(failed_params), retried_count, first_error
+
+def build_partition_batches(session, cql, params, partition_positions, max_batch_rows=20):
+    """
+    Groups rows by partition key into UNLOGGED batches of at most `max_batch_rows`. Each batch
+    touches a single partition, so the coordinator applies it as one mutation on one replica set
+    (unlike a multi-partition batch). Returns a list of (batch, row_count).
+    """
+    prepared = prepare_cached(session, cql)
+    rows_by_partition = defaultdict(list)
+    for row in params:
+        rows_by_partition[tuple(row[position] for position in partition_positions)].append(row)
+    batches = []
+    for partition_rows in rows_by_partition.values():
+        for start in range(0, len(partition_rows), max_batch_rows):
+            chunk = partition_rows[start:start + max_batch_rows]
+            batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+            for row in chunk:
+                batch.add(prepared, row)
+            batches.append((batch, len(chunk)))
+    return batches
+
+def write_partition_batches(session, cql, params, partition_positions, concurrency=64, max_batch_rows=20,
+                            max_retries=3, retry_backoff_s=0.5):
+    """Like write_rows, but sends single-partition UNLOGGED batches. The failed count is in rows."""
+    batches = build_partition_batches(session, cql, params, partition_positions, max_batch_rows)
+    run_statements = lambda pending: execute_concurrent(
+        session, [(batch, None) for batch, _ in pending], concurrency=concurrency, raise_on_first_error=False
+    )
+    failed_batches, retried_count, first_error = _run_with_retries(run_statements, batches, max_retries, retry_backoff_s)
+    return sum(row_count for _, row_count in failed_batches), retried_count, first_error
+
+def write_plain_chunk(session, df_chunk, concurrency=128, max_retries=3):
+    """Writes a transaksi_harian chunk to the plain table. Returns (failed_count, retried_count, first_error)."""
+    return write_rows(session, INSERT_PLAIN_CQL, build_transaksi_params(df_chunk), concurrency, max_retries)
+
+def write_indexed_chunk(session, df_chunk, concurrency=64, use_batches=True, max_batch_rows=20, max_retries=3):
+    """Writes a transaksi_harian chunk to the indexed table. Returns (failed_count, retried_count, first_error)."""
+    indexed_params = _to_indexed_order(build_transaksi_params(df_chunk))
+    if use_batches:
+        partition_positions = [INDEXED_COLUMNS.index(column) for column in INDEXED_PARTITION_KEY]
+        return write_partition_batches(session, INSERT_INDEXED_CQL, indexed_params, partition_positions,
+                                       concurrency, max_batch_rows, max_retries)
+    return write_rows(session, INSERT_INDEXED_CQL, indexed_params, concurrency, max_retries)
+
+def ingest_transaksi_harian(session, df_transaksi, chunk_rows=20000, concurrency=128, use_batches=True,
+                            max_batch_rows=20, max_retries=3, progress_callback=None):
+    """
+    Loads transaksi_harian rows into both the plain and the indexed table. Rows are converted and
+    written `chunk_rows` at a time, so memory stays flat for multi-million-row frames, and each
+    chunk is written with `concurrency` requests in flight. The indexed table gets single-partition
+    UNLOGGED batches when `use_batches` is set.
+
+    `progress_callback`, if given, is called after every chunk with the running summary.
+    Returns the summary dict: rows, plain_failed, indexed_failed, retried, elapsed_s, rows_per_s, first_error.
+    """
+    summary = {"rows": 0, "plain_failed": 0, "indexed_failed": 0, "retried": 0,
+               "elapsed_s": 0.0, "rows_per_s": 0.0, "total_rows": len(df_transaksi), "first_error": None}
+    partition_positions = [INDEXED_COLUMNS.index(column) for column in INDEXED_PARTITION_KEY]
+    start_time = time.perf_counter()
+    for chunk_start in range(0, len(df_transaksi), chunk_rows):
+        params = build_transaksi_params(df_transaksi.iloc[chunk_start:chunk_start + chunk_rows])
+        indexed_params = _to_indexed_order(params)
+
+        plain_failed, plain_retried, plain_error = write_rows(session, INSERT_PLAIN_CQL, params, concurrency, max_retries)
+        if use_batches:
+            indexed_failed, indexed_retried, indexed_error = write_partition_batches(
+                session, INSERT_INDEXED_CQL, indexed_params, partition_positions,
+                max(1, concurrency // 2), max_batch_rows, max_retries
+            )
+        else:
+            indexed_failed, indexed_retried, indexed_error = write_rows(session, INSERT_INDEXED_CQL, indexed_params, concurrency, max_retries)
+
+        summary["rows"] += len(params)
+        summary["plain_failed"] += plain_failed
+        summary["indexed_failed"] += indexed_failed
+        summary["retried"] += plain_retried + indexed_retried
+        summary["first_error"] = summary["first_error"] or plain_error or indexed_error
+        summary["elapsed_s"] = time.perf_counter() - start_time
+        summary["rows_per_s"] = summary["rows"] / summary["elapsed_s"] if summary["elapsed_s"] > 0 else 0.0
+        if progress_callback is not None:
+            progress_callback(dict(summary))
+    return summary
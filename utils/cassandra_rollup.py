@@ -0,0 +1,148 @@
+# utils/cassandra_rollup.py
+import pandas as pd
+from cassandra.concurrent import execute_concurrent_with_args
+from datetime import timedelta
+from utils.cassandra_ingest import write_partition_batches
+from utils.cassandra_utils import prepare_cached
+
+ROLLUP_TABLE = "performa_karyawan_harian"
+TRUNCATE_TIMEOUT_S = 60.0
+
+# One partition per day, one row per employee active on that day.
+# Plain BIGINT totals, always written as complete values computed from the source rows
+# (see rebuild_daily_rollup), so writing the same rollup again leaves it unchanged.
+CREATE_ROLLUP_TABLE_CQL = f"""
+CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+    tanggal DATE,
+    id_karyawan TEXT,
+    total_sales BIGINT,
+    transactions_handled BIGINT,
+    PRIMARY KEY ((tanggal), id_karyawan)
+) WITH CLUSTERING ORDER BY (id_karyawan ASC);
+"""
+
+INSERT_ROLLUP_CQL = f"""
+INSERT INTO {ROLLUP_TABLE} (tanggal, id_karyawan, total_sales, transactions_handled) VALUES (?, ?, ?, ?)
+"""
+
+SELECT_ROLLUP_DAY_CQL = f"""
+SELECT tanggal, id_karyawan, total_sales, transactions_handled
+FROM {ROLLUP_TABLE} WHERE tanggal = ?
+"""
+
+ROLLUP_COLUMNS = ['tanggal', 'id_karyawan', 'total_sales', 'transactions_handled']
+
+def ensure_rollup_table(session):
+    """
+    Creates the daily rollup table in the session's keyspace if it doesn't exist. An older
+    COUNTER version of the table is dropped first: its totals grew on every re-load.
+    """
+    keyspace_meta = session.cluster.metadata.keyspaces.get(session.keyspace)
+    table_meta = keyspace_meta.tables.get(ROLLUP_TABLE) if keyspace_meta is not None else None
+    if table_meta is not None and table_meta.columns['total_sales'].cql_type == 'counter':
+        session.execute(f"DROP TABLE {ROLLUP_TABLE}", timeout=TRUNCATE_TIMEOUT_S)
+    session.execute(CREATE_ROLLUP_TABLE_CQL)
+
+def truncate_rollup_table(session):
+    """Empties the rollup, e.g. before a restarted load rebuilds it."""
+    session.execute(f"TRUNCATE {ROLLUP_TABLE}", timeout=TRUNCATE_TIMEOUT_S)
+
+def rollup_table_exists(session):
+    """
+    Checks the driver's schema metadata for the rollup table, so callers can
+    fall back to scanning the raw transaction table when it isn't there.
+    """
+    keyspace_meta = session.cluster.metadata.keyspaces.get(session.keyspace)
+    return keyspace_meta is not None and ROLLUP_TABLE in keyspace_meta.tables
+
+def build_daily_rollup(df_transaksi):
+    """
+    Collapses transaksi_harian line items into one row per (tanggal, id_karyawan)
+    with summed total_transaksi and the number of line items handled.
+    """
+    if df_transaksi.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+    df = df_transaksi[['tanggal', 'id_karyawan', 'total_transaksi']].copy()
+    df['tanggal'] = pd.to_datetime(df['tanggal']).dt.date
+    return df.groupby(['tanggal', 'id_karyawan'], sort=False).agg(
+        total_sales=('total_transaksi', 'sum'),
+        transactions_handled=('total_transaksi', 'size')
+    ).reset_index()
+
+def _sum_rollups(df_rollups):
+    return pd.concat(df_rollups, ignore_index=True).groupby(['tanggal', 'id_karyawan'], sort=False).agg(
+        total_sales=('total_sales', 'sum'),
+        transactions_handled=('transactions_handled', 'sum')
+    ).reset_index()
+
+def fold_daily_rollup(chunks, fold_every=20):
+    """
+    Sums build_daily_rollup over every transaksi_harian chunk into complete per-(tanggal, id_karyawan)
+    totals. Partial rollups are folded every `fold_every` chunks, so memory stays proportional
+    to days x employees rather than to the number of source rows.
+    """
+    partial_rollups = []
+    for df_chunk in chunks:
+        partial_rollups.append(build_daily_rollup(df_chunk))
+        if len(partial_rollups) >= fold_every:
+            partial_rollups = [_sum_rollups(partial_rollups)]
+    if not partial_rollups:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+    return _sum_rollups(partial_rollups)
+
+def write_daily_rollup(session, df_rollup, concurrency=64, max_batch_rows=20, max_retries=3):
+    """
+    Writes complete rollup rows as single-partition (per tanggal) UNLOGGED batches. The rows overwrite
+    whatever is stored, so failed writes are simply retried. Returns (failed_count, retried_count, first_error).
+    """
+    if df_rollup.empty:
+        return 0, 0, None
+    params = list(zip(
+        df_rollup['tanggal'].tolist(),
+        df_rollup['id_karyawan'].tolist(),
+        df_rollup['total_sales'].astype('int64').tolist(),
+        df_rollup['transactions_handled'].astype('int64').tolist()
+    ))
+    return write_partition_batches(session, INSERT_ROLLUP_CQL, params, [0], concurrency, max_batch_rows, max_retries)
+
+def rebuild_daily_rollup(session, chunks, concurrency=64):
+    """
+    Rebuilds the whole rollup from the transaksi_harian rows in `chunks`: totals are folded in
+    memory first, then the table is truncated and rewritten. Running it again over the same rows
+    gives the same table, so retries, restarts and resumed loads can never double-count.
+    Returns (rows_written, failed_count, first_error).
+    """
+    df_rollup = fold_daily_rollup(chunks)
+    truncate_rollup_table(session)
+    failed_count, _, first_error = write_daily_rollup(session, df_rollup, concurrency)
+    return len(df_rollup) - failed_count, failed_count, first_error
+
+def fetch_daily_rollup(session, start_date, end_date, concurrency=32):
+    """
+    Reads the rollup partitions for every day in [start_date, end_date].
+    Cost scales with the number of days requested, not with the size of transaksi_harian.
+    """
+    num_days = (end_date - start_date).days + 1
+    if num_days <= 0:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+    prepared = prepare_cached(session, SELECT_ROLLUP_DAY_CQL)
+    day_params = [(start_date + timedelta(days=offset),) for offset in range(num_days)]
+    results = execute_concurrent_with_args(session, prepared, day_params, concurrency=concurrency)
+
+    rows = []
+    for _, result_set in results:
+        rows.extend(result_set)
+    return pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+
+def fetch_rollup_performance(session, start_date, end_date, concurrency=32):
+    """
+    Employee performance for a date range, answered from the rollup table:
+    one row per id_karyawan with total_sales and transactions_handled.
+    """
+    df_days = fetch_daily_rollup(session, start_date, end_date, concurrency=concurrency)
+    if df_days.empty:
+        return pd.DataFrame(columns=['id_karyawan', 'total_sales', 'transactions_handled'])
+    return df_days.groupby('id_karyawan').agg(
+        total_sales=('total_sales', 'sum'),
+        transactions_handled=('transactions_handled', 'sum')
+    ).reset_index()
@@ -0,0 +1,83 @@
+# utils/cassandra_server_aggregation.py
+import pandas as pd
+from cassandra.concurrent import execute_concurrent_with_args
+from datetime import timedelta
+from utils.cassandra_ingest import build_transaksi_params, write_partition_batches, TRANSAKSI_COLUMNS
+from utils.cassandra_utils import prepare_cached
+
+AGGREGATION_TABLE = "transaksi_harian_per_tanggal"
+
+# One partition per day, clustered by branch then employee. Cassandra (3.10+) can only GROUP BY a
+# primary-key prefix, so with this layout both branch/day and employee/day sums are computed
+# server-side and only one row per group crosses the network instead of every line item.
+# total_transaksi is BIGINT here because SUM() returns the column's own type.
+CREATE_AGGREGATION_TABLE_CQL = f"""
+CREATE TABLE IF NOT EXISTS {AGGREGATION_TABLE} (
+    tanggal DATE,
+    id_cabang TEXT,
+    id_karyawan TEXT,
+    id_transaksi_harian UUID,
+    id_transaksi TEXT,
+    total_transaksi BIGINT,
+    PRIMARY KEY ((tanggal), id_cabang, id_karyawan, id_transaksi_harian)
+) WITH CLUSTERING ORDER BY (id_cabang ASC, id_karyawan ASC, id_transaksi_harian ASC);
+"""
+
+AGGREGATION_COLUMNS = ['tanggal', 'id_cabang', 'id_karyawan', 'id_transaksi_harian', 'id_transaksi', 'total_transaksi']
+INSERT_AGGREGATION_CQL = f"INSERT INTO {AGGREGATION_TABLE} ({', '.join(AGGREGATION_COLUMNS)}) VALUES ({', '.join('?' for _ in AGGREGATION_COLUMNS)})"
+
+# GROUP BY column lists per aggregation level (always a primary-key prefix)
+GROUP_BY_LEVELS = {
+    "employee": ['tanggal', 'id_cabang', 'id_karyawan'],
+    "branch": ['tanggal', 'id_cabang'],
+}
+
+def build_group_by_cql(level="employee"):
+    group_columns = GROUP_BY_LEVELS[level]
+    return f"""
+SELECT {', '.join(group_columns)}, SUM(total_transaksi) AS total_sales, COUNT(id_transaksi) AS transactions_handled
+FROM {AGGREGATION_TABLE} WHERE tanggal = ? GROUP BY {', '.join(group_columns)}
+"""
+
+def ensure_aggregation_table(session):
+    """Creates the GROUP BY-friendly transaction table in the session's keyspace if it doesn't exist."""
+    session.execute(CREATE_AGGREGATION_TABLE_CQL)
+
+def truncate_aggregation_table(session, timeout=60.0):
+    """Empties the aggregation table, so a fresh load doesn't sum old and new line items together."""
+    session.execute(f"TRUNCATE {AGGREGATION_TABLE}", timeout=timeout)
+
+def aggregation_table_exists(session):
+    """Checks the driver's schema metadata, so callers can fall back to client-side aggregation."""
+    keyspace_meta = session.cluster.metadata.keyspaces.get(session.keyspace)
+    return keyspace_meta is not None and AGGREGATION_TABLE in keyspace_meta.tables
+
+def write_aggregation_chunk(session, df_chunk, concurrency=64, max_batch_rows=20, max_retries=3):
+    """
+    Writes a transaksi_harian chunk to the aggregation table as single-partition (per tanggal)
+    UNLOGGED batches. The INSERTs are idempotent, so re-sending a chunk on resume is safe.
+    Returns (failed_count, retried_count, first_error).
+    """
+    positions = [TRANSAKSI_COLUMNS.index(column) for column in AGGREGATION_COLUMNS]
+    params = [tuple(row[position] for position in positions) for row in build_transaksi_params(df_chunk)]
+    return write_partition_batches(session, INSERT_AGGREGATION_CQL, params, [AGGREGATION_COLUMNS.index('tanggal')],
+                                   concurrency, max_batch_rows, max_retries)
+
+def fetch_server_aggregates(session, start_date, end_date, level="employee", concurrency=32):
+    """
+    Runs one GROUP BY query per day partition in [start_date, end_date] and returns the rows
+    exactly as Cassandra sent them: GROUP_BY_LEVELS[level] columns plus total_sales and
+    transactions_handled, one row per group.
+    """
+    columns = GROUP_BY_LEVELS[level] + ['total_sales', 'transactions_handled']
+    num_days = (end_date - start_date).days + 1
+    if num_days <= 0:
+        return pd.DataFrame(columns=columns)
+    prepared = prepare_cached(session, build_group_by_cql(level))
+    day_params = [(start_date + timedelta(days=offset),) for offset in range(num_days)]
+    results = execute_concurrent_with_args(session, prepared, day_params, concurrency=concurrency)
+
+    rows = []
+    for _, result_set in results:
+        rows.extend(result_set)
+    return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,88 @@
+# utils/cassandra_tracing.py
+# Opt-in query tracing for the Cassandra benchmark: the server-side event timeline from
+# system_traces, next to the client-side time spent on round-trips, row objects and the DataFrame.
+import re
+import time
+import pandas as pd
+from cassandra.query import SimpleStatement, named_tuple_factory
+from utils.cassandra_utils import RAW_ROWS_PROFILE, prepare_cached
+
+TRACE_WAIT_S = 5.0 # Trace events are written asynchronously; wait this long per page for them
+COORDINATOR_THREAD_PREFIX = "Native-Transport-Requests"
+
+# Trace event descriptions worth counting (Cassandra 3.x/4.x wording)
+SSTABLES_READ_PATTERN = re.compile(r"(?:Merged data from memtables and|seq scan across) (\d+) sstables")
+ROWS_READ_PATTERN = re.compile(r"Read (\d+) live rows and (\d+) tombstone cells")
+
+def trace_events_frame(traces):
+    """One row per trace event across all pages: page, source, thread, elapsed (ms), description."""
+    rows = []
+    for page_number, trace in enumerate(traces, start=1):
+        for event in trace.events:
+            rows.append({
+                "page": page_number,
+                "source": str(event.source),
+                "thread": event.thread_name,
+                "elapsed_ms": event.source_elapsed.total_seconds() * 1000 if event.source_elapsed is not None else None,
+                "description": event.description,
+            })
+    return pd.DataFrame(rows, columns=["page", "source", "thread", "elapsed_ms", "description"])
+
+def summarize_traces(traces, df_events):
+    """
+    Totals over all pages: replicas contacted, sstables read, live rows and tombstones read,
+    time at the coordinator (trace duration) and the longest replica-side span per page.
+    Replica events are those not on the coordinator's Native-Transport-Requests threads
+    (ReadStage etc.), so a single-node cluster still shows its local read time.
+    """
+    sstables = sum(int(match.group(1)) for match in df_events["description"].map(SSTABLES_READ_PATTERN.search).dropna())
+    rows_read = [match.groups() for match in df_events["description"].map(ROWS_READ_PATTERN.search).dropna()]
+    replica_events = df_events[~df_events["thread"].fillna("").str.startswith(COORDINATOR_THREAD_PREFIX)].dropna(subset=["elapsed_ms"])
+    replica_spans = replica_events.groupby(["page", "source"])["elapsed_ms"].agg(lambda elapsed: elapsed.max() - elapsed.min())
+    return {
+        "pages": len(traces),
+        "coordinator": ", ".join(sorted({str(trace.coordinator) for trace in traces})),
+        "replicas_contacted": int(df_events["source"].nunique()),
+        "sstables_read": sstables,
+        "live_rows_read": sum(int(live) for live, _ in rows_read),
+        "tombstones_read": sum(int(tombstones) for _, tombstones in rows_read),
+        "coordinator_ms": sum(trace.duration.total_seconds() * 1000 for trace in traces if trace.duration is not None),
+        "replica_ms": float(replica_spans.groupby(level="page").max().sum()) if not replica_spans.empty else 0.0,
+    }
+
+def run_traced_query(session, cql_query: str, use_prepared: bool = False):
+    """
+    Runs `cql_query` once with tracing on and splits where the time went:
+      * "Round-trips (server + network + value decoding)": session.execute and every page fetch.
+        Rows arrive as plain tuples (RAW_ROWS_PROFILE), so named-tuple creation is excluded here.
+      * "Row objects": building the named-tuple rows the benchmark normally receives.
+      * "DataFrame construction": pd.DataFrame over those rows.
+    The server's own share of the round-trips is the traced coordinator time in the summary.
+    Returns (DataFrame, client timings in seconds, trace summary, trace events DataFrame).
+    Tracing writes to system_traces, so this run is slower than an untraced one.
+    """
+    statement = prepare_cached(session, cql_query) if use_prepared else SimpleStatement(str(cql_query))
+    start_time = time.perf_counter()
+    result = session.execute(statement, trace=True, execution_profile=RAW_ROWS_PROFILE)
+    raw_rows = list(result.current_rows)
+    while result.has_more_pages:
+        result.fetch_next_page()
+        raw_rows.extend(result.current_rows)
+    round_trip_s = time.perf_counter() - start_time
+
+    row_start = time.perf_counter()
+    rows = named_tuple_factory(result.column_names, raw_rows) if result.column_names else []
+    row_objects_s = time.perf_counter() - row_start
+
+    frame_start = time.perf_counter()
+    df = pd.DataFrame(rows)
+    dataframe_s = time.perf_counter() - frame_start
+
+    traces = [trace for trace in result.get_all_query_traces(max_wait_sec_per=TRACE_WAIT_S) if trace is not None]
+    df_events = trace_events_frame(traces)
+    timings = {
+        "Round-trips (server + network + value decoding)": round_trip_s,
+        "Row objects": row_objects_s,
+        "DataFrame construction": dataframe_s,
+    }
+    return df, timings, summarize_traces(traces, df_events), df_events
@@ -1,43 +1,153 @@
 # utils/cassandra_utils.py
-import streamlit as st
-from cassandra.cluster import Cluster
+import importlib.util
+import os
+import threading
+import weakref
+from cassandra import ConsistencyLevel
+from cassandra.auth import PlainTextAuthProvider
+from cassandra.cluster import Cluster, ExecutionProfile, EXEC_PROFILE_DEFAULT
+from cassandra.policies import DCAwareRoundRobinPolicy, HostDistance, TokenAwarePolicy
+from cassandra.query import tuple_factory
 
+# Defaults only: the environment is read when load_cassandra_config() is called, so each entry point
+# (app.py, the benchmark CLI) loads its own env file first and no .env is read at import time
 CASSANDRA_CONTACT_POINTS = ["34.101.196.40"]
 CASSANDRA_PORT = 9042
 CASSANDRA_KEYSPACE = "day_grocery" # As defined in your notebook
 
-@st.cache_resource # Cache the session across reruns for the app's lifetime
-def init_cassandra_connection():
-    """
-    Initializes and returns a Cassandra session.
-    Caches the session object for reuse.
-    """
-    try:
-        cluster = Cluster(contact_points=CASSANDRA_CONTACT_POINTS, port=CASSANDRA_PORT)
-        # Connect without specifying keyspace first to ensure keyspace creation can happen
-        session = cluster.connect()
-        # Create keyspace if it doesn't exist (idempotent)
-        session.execute(f"""
-            CREATE KEYSPACE IF NOT EXISTS {CASSANDRA_KEYSPACE}
-            WITH replication = {{ 'class': 'SimpleStrategy', 'replication_factor': '1' }}
-        """)
-        # Switch to the desired keyspace
-        session.set_keyspace(CASSANDRA_KEYSPACE)
-        # Store status in session_state to inform the user, not strictly necessary for functionality
-        st.session_state['cassandra_connection_status'] = f"Successfully connected to Cassandra keyspace: {CASSANDRA_KEYSPACE}"
-        return session
-    except Exception as e:
-        st.session_state['cassandra_connection_status'] = f"Failed to connect to Cassandra: {e}"
-        # Display error in the app when connection fails
-        st.error(f"Cassandra Connection Error: {e}")
-        return None
-
-def get_cassandra_session():
-    """
-    Retrieves the cached Cassandra session.
-    If connection failed, it will return None and an error would have been displayed.
-    """
-    return init_cassandra_connection()
-
-# Note: Streamlit's @st.cache_resource is designed to handle the lifecycle of resources,
-# including cleanup like shutting down the cluster when the app session ends or script reruns.
\ No newline at end of file
+# Execution profile for long-running analytical scans (token-range scans, ALLOW FILTERING fallbacks)
+ANALYTICS_PROFILE = "analytics"
+# Same settings as the default profile, but rows come back as plain tuples (see cassandra_tracing.py)
+RAW_ROWS_PROFILE = "raw_rows"
+
+def load_cassandra_config():
+    """
+    Reads driver settings from the environment, so the same app can target
+    a local Docker node or a multi-node cluster without code changes.
+    """
+    protocol_version = os.getenv("CASSANDRA_PROTOCOL_VERSION")
+    return {
+        "contact_points": [host.strip() for host in os.getenv("CASSANDRA_CONTACT_POINTS", ",".join(CASSANDRA_CONTACT_POINTS)).split(",") if host.strip()],
+        "port": int(os.getenv("CASSANDRA_PORT", str(CASSANDRA_PORT))),
+        "keyspace": os.getenv("CASSANDRA_KEYSPACE", CASSANDRA_KEYSPACE),
+        "local_dc": os.getenv("CASSANDRA_LOCAL_DC") or None, # None lets the driver infer it from the contact points
+        "used_hosts_per_remote_dc": int(os.getenv("CASSANDRA_USED_HOSTS_PER_REMOTE_DC", "0")),
+        "protocol_version": int(protocol_version) if protocol_version else None, # None negotiates the highest supported
+        "compression": os.getenv("CASSANDRA_COMPRESSION", "lz4").lower(), # lz4 | snappy | auto | none
+        "consistency_level": os.getenv("CASSANDRA_CONSISTENCY", "LOCAL_ONE").upper(),
+        "request_timeout": float(os.getenv("CASSANDRA_REQUEST_TIMEOUT", "10")),
+        "analytics_request_timeout": float(os.getenv("CASSANDRA_ANALYTICS_REQUEST_TIMEOUT", "120")),
+        "core_connections_per_host": int(os.getenv("CASSANDRA_CORE_CONNECTIONS_PER_HOST", "2")),
+        "max_connections_per_host": int(os.getenv("CASSANDRA_MAX_CONNECTIONS_PER_HOST", "8")),
+        "max_requests_per_connection": int(os.getenv("CASSANDRA_MAX_REQUESTS_PER_CONNECTION", "128")),
+        "username": os.getenv("CASSANDRA_USERNAME") or None,
+        "password": os.getenv("CASSANDRA_PASSWORD") or None,
+    }
+
+def _resolve_compression(compression):
+    if compression in ("none", "false", ""):
+        return False
+    if compression == "lz4":
+        if importlib.util.find_spec("lz4") is not None: # Optional dependency, the driver imports it lazily
+            return "lz4"
+        return True # Let the driver pick any compressor that is installed
+    if compression == "snappy":
+        return "snappy"
+    return True
+
+def build_cassandra_cluster(config=None):
+    """
+    Builds a Cluster with token-aware, DC-aware routing: requests go straight to a
+    replica of their partition in the local DC instead of a random coordinator.
+    Token awareness only applies to prepared/bound statements (see prepare_cached).
+    """
+    config = config or load_cassandra_config()
+    load_balancing_policy = TokenAwarePolicy(DCAwareRoundRobinPolicy(
+        local_dc=config["local_dc"], used_hosts_per_remote_dc=config["used_hosts_per_remote_dc"]
+    ))
+    consistency_level = ConsistencyLevel.name_to_value[config["consistency_level"]]
+    execution_profiles = {
+        EXEC_PROFILE_DEFAULT: ExecutionProfile(
+            load_balancing_policy=load_balancing_policy,
+            consistency_level=consistency_level,
+            request_timeout=config["request_timeout"],
+        ),
+        ANALYTICS_PROFILE: ExecutionProfile(
+            load_balancing_policy=load_balancing_policy,
+            consistency_level=consistency_level,
+            request_timeout=config["analytics_request_timeout"],
+        ),
+        RAW_ROWS_PROFILE: ExecutionProfile(
+            load_balancing_policy=load_balancing_policy,
+            consistency_level=consistency_level,
+            request_timeout=config["request_timeout"],
+            row_factory=tuple_factory,
+        ),
+    }
+    cluster_kwargs = {
+        "contact_points": config["contact_points"],
+        "port": config["port"],
+        "execution_profiles": execution_profiles,
+        "compression": _resolve_compression(config["compression"]),
+    }
+    if config["protocol_version"]:
+        cluster_kwargs["protocol_version"] = config["protocol_version"]
+    if config["username"]:
+        cluster_kwargs["auth_provider"] = PlainTextAuthProvider(username=config["username"], password=config["password"])
+    return Cluster(**cluster_kwargs)
+
+def apply_pool_limits(cluster, config):
+    """
+    Applies per-host connection and request limits. The driver only supports these
+    knobs on protocol v1/v2; from v3 on it multiplexes up to 32k streams over a
+    single connection per host, so the limits are left to the driver there.
+    Returns True when the limits were applied.
+    """
+    if cluster.protocol_version >= 3:
+        return False
+    for distance in (HostDistance.LOCAL, HostDistance.REMOTE):
+        cluster.set_core_connections_per_host(distance, config["core_connections_per_host"])
+        cluster.set_max_connections_per_host(distance, config["max_connections_per_host"])
+        cluster.set_max_requests_per_connection(distance, config["max_requests_per_connection"])
+    return True
+
+# ----------------- Prepared Statement Registry -----------------
+# PreparedStatements are per-session (they hold the session's routing metadata),
+# so the registry is keyed by session first and by normalized CQL text second.
+_prepared_statements = weakref.WeakKeyDictionary()
+_prepared_statements_lock = threading.Lock()
+
+def normalize_cql(cql_query: str) -> str:
+    """Strips surrounding whitespace and a trailing ';' so equivalent query texts share one cache entry."""
+    return cql_query.strip().rstrip(';').strip()
+
+def prepare_cached(session, cql_query: str):
+    """
+    Returns a PreparedStatement for `cql_query`, preparing it on the cluster only the
+    first time it is seen for this session. Bound executions skip server-side parsing
+    and let the driver route each request to a replica for its partition key.
+    """
+    cql_key = normalize_cql(cql_query)
+    with _prepared_statements_lock:
+        session_cache = _prepared_statements.setdefault(session, {})
+        prepared = session_cache.get(cql_key)
+    if prepared is None:
+        prepared = session.prepare(cql_key)
+        with _prepared_statements_lock:
+            prepared = session_cache.setdefault(cql_key, prepared)
+    return prepared
+
+def bind_cached(session, cql_query: str, params=(), fetch_size=None):
+    """Binds `params` to the cached prepared statement; fetch_size is set per bound statement, not on the shared one."""
+    bound = prepare_cached(session, cql_query).bind(params)
+    if fetch_size is not None:
+        bound.fetch_size = fetch_size
+    return bound
+
+def execute_prepared(session, cql_query: str, params=(), **execute_kwargs):
+    """Executes `cql_query` through the prepared statement cache with bind parameters."""
+    return session.execute(prepare_cached(session, cql_query), params, **execute_kwargs)
+
+def prepared_statement_count(session) -> int:
+    with _prepared_statements_lock:
+        return len(_prepared_statements.get(session, {}))
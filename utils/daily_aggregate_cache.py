@@ -0,0 +1,113 @@
+# utils/daily_aggregate_cache.py
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+import pandas as pd
+
+DAILY_COLUMNS = ['id_karyawan', 'total_sales', 'transactions_handled']
+DEFAULT_MAX_DAYS = 1000
+
+def sum_daily_frames(df_days_list):
+    """Sums per-day frames (DAILY_COLUMNS) into one row per employee."""
+    non_empty = [df_day for df_day in df_days_list if not df_day.empty]
+    if not non_empty:
+        return pd.DataFrame(columns=DAILY_COLUMNS)
+    return pd.concat(non_empty, ignore_index=True).groupby('id_karyawan').agg(
+        total_sales=('total_sales', 'sum'),
+        transactions_handled=('transactions_handled', 'sum')
+    ).reset_index()
+
+class DailyAggregateCache:
+    """
+    Per-day employee aggregates (id_karyawan, total_sales, transactions_handled), keyed by date.
+    A range query only fetches the days that are not cached yet, then sums the cached days
+    per employee, so widening or shifting a range costs Cassandra just the new days.
+
+    Days are kept in memory with LRU eviction beyond `max_days`, and written to `disk_dir`
+    (one Parquet file per day) when it is set, so they survive app restarts. Days from
+    today onwards are never cached because they can still receive transactions, and days
+    with no rows are never cached either: an empty answer may just mean the source (e.g. a
+    rollup being rebuilt after a fresh load) isn't filled yet.
+    """
+    def __init__(self, max_days=DEFAULT_MAX_DAYS, disk_dir=None):
+        self.max_days = max_days
+        self.disk_dir = disk_dir
+        self._days = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _day_path(self, day):
+        return os.path.join(self.disk_dir, f"{day.isoformat()}.parquet")
+
+    def _get_day(self, day):
+        if day in self._days:
+            self._days.move_to_end(day)
+            return self._days[day]
+        if self.disk_dir and os.path.exists(self._day_path(day)):
+            df_day = pd.read_parquet(self._day_path(day))
+            if df_day.empty:
+                return None # Written by an older version that cached empty days: fetch it again
+            self._put_day(day, df_day, write_to_disk=False)
+            return df_day
+        return None
+
+    def _put_day(self, day, df_day, write_to_disk=True):
+        if day >= date.today() or df_day.empty:
+            return
+        self._days[day] = df_day
+        self._days.move_to_end(day)
+        while len(self._days) > self.max_days:
+            self._days.popitem(last=False)
+        if write_to_disk and self.disk_dir:
+            df_day.to_parquet(self._day_path(day), index=False)
+
+    @staticmethod
+    def _missing_runs(missing_days):
+        """Groups sorted missing days into contiguous (start, end) runs, one fetch per run."""
+        runs = []
+        for day in missing_days:
+            if runs and day == runs[-1][1] + timedelta(days=1):
+                runs[-1][1] = day
+            else:
+                runs.append([day, day])
+        return [tuple(run) for run in runs]
+
+    def get_range(self, start_date, end_date, fetch_days):
+        """
+        Employee totals for [start_date, end_date]. `fetch_days(run_start, run_end)` is called
+        for each contiguous run of uncached days and must return per-day rows with a
+        `tanggal` (datetime.date) column plus DAILY_COLUMNS.
+        Returns (DataFrame of DAILY_COLUMNS summed per employee, {"cached_days", "fetched_days"}).
+        """
+        all_days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        with self._lock:
+            frames = {day: self._get_day(day) for day in all_days}
+        missing_days = [day for day, df_day in frames.items() if df_day is None]
+
+        for run_start, run_end in self._missing_runs(missing_days):
+            df_run = fetch_days(run_start, run_end)
+            grouped = dict(tuple(df_run.groupby('tanggal'))) if not df_run.empty else {}
+            with self._lock:
+                for offset in range((run_end - run_start).days + 1):
+                    day = run_start + timedelta(days=offset)
+                    # Days without rows are returned as empty frames but not cached (see class docstring)
+                    df_day = grouped[day][DAILY_COLUMNS].reset_index(drop=True) if day in grouped else pd.DataFrame(columns=DAILY_COLUMNS)
+                    frames[day] = df_day
+                    self._put_day(day, df_day)
+
+        stats = {"cached_days": len(all_days) - len(missing_days), "fetched_days": len(missing_days)}
+        return sum_daily_frames(frames.values()), stats
+
+    def clear(self):
+        """Drops every cached day (memory and disk), e.g. after new data was ingested for past days."""
+        with self._lock:
+            self._days.clear()
+            if self.disk_dir:
+                for file_name in os.listdir(self.disk_dir):
+                    if file_name.endswith(".parquet"):
+                        os.remove(os.path.join(self.disk_dir, file_name))
+
+    def __len__(self):
+        return len(self._days)
@@ -0,0 +1,234 @@
+# utils/data_generator.py
+# Synthetic grocery data for 01-generate-data.ipynb. Everything per-row is drawn with a
+# seeded NumPy generator; Faker only fills small pools of names/addresses that rows sample
+# from, so generating millions of rows costs array operations instead of Python loops.
+from datetime import date
+import numpy as np
+import pandas as pd
+from faker import Faker
+from utils.grocery_dataset import write_table, write_table_chunks
+
+DEFAULT_SEED = 42
+DEFAULT_POOL_SIZE = 2000
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+TRANSACTION_START_DATE = date(2024, 1, 1)
+TRANSACTION_END_DATE = date(2024, 12, 31)
+
+# --- Master Data ---
+JABATAN_LIST = ['Kasir', 'Staff Gudang', 'Supervisor Toko', 'Asisten Manajer', 'Manajer Toko', 'Pramuniaga', 'Admin']
+
+# Items and their consistent prices (100 unique items)
+ITEMS_PRICE_MAP = {
+    'Beras Premium 5kg': 65000,
+    'Minyak Goreng Refill 2L': 32000,
+    'Gula Pasir 1kg': 14000,
+    'Telur Ayam (per kg)': 25000,
+    'Roti Tawar': 15000,
+    'Susu UHT Cokelat 1L': 18000,
+    'Kopi Instan Sachet (isi 10)': 12000,
+    'Teh Celup Kotak (isi 25)': 8000,
+    'Mie Instan Goreng (5 bungkus)': 13000,
+    'Sabun Mandi Batang': 3000,
+    'Shampoo Botol 170ml': 22000,
+    'Pasta Gigi 100g': 9000,
+    'Deterjen Bubuk 800g': 17000,
+    'Air Mineral Galon 19L': 20000,
+    'Biskuit Kaleng': 35000,
+    'Keju Slice 10 lembar': 27000,
+    'Sosis Ayam 500g': 30000,
+    'Daging Sapi (per kg)': 110000,
+    'Daging Ayam (per kg)': 38000,
+    'Sayur Bayam Ikat': 4000,
+    'Wortel 1kg': 10000,
+    'Kentang 1kg': 13000,
+    'Bawang Merah 1kg': 28000,
+    'Bawang Putih 1kg': 26000,
+    'Cabai Merah 250g': 12000,
+    'Tomat 1kg': 8000,
+    'Mentimun 1kg': 7000,
+    'Minyak Samin 200ml': 15000,
+    'Kecap Manis Botol 275ml': 12000,
+    'Saus Sambal Botol 135ml': 9000,
+    'Santan Instan 65ml (5 pcs)': 10000,
+    'Kerupuk Udang 250g': 11000,
+    'Tepung Terigu 1kg': 12000,
+    'Tepung Beras 500g': 8000,
+    'Garam Dapur 500g': 3000,
+    'Margarin 200g': 6000,
+    'Susu Kental Manis Kaleng': 10000,
+    'Susu Bubuk Anak 400g': 55000,
+    'Baterai AA Isi 2': 12000,
+    'Tisu Gulung Isi 2': 9000,
+    'Tisu Wajah 1 Kotak': 8000,
+    'Sabun Cuci Piring 800ml': 15000,
+    'Pembersih Lantai 800ml': 14000,
+    'Pel Lantai': 25000,
+    'Sapu Lidi': 12000,
+    'Ember 10L': 18000,
+    'Gayung Plastik': 7000,
+    'Sikat Gigi 2 pcs': 9000,
+    'Handuk Kecil': 25000,
+    'Sikat WC': 10000,
+    'Kain Pel': 8000,
+    'Kopi Bubuk 200g': 22000,
+    'Kopi Instan Botol 240ml': 9000,
+    'Air Mineral 600ml (isi 6)': 18000,
+    'Cokelat Batangan 50g': 7000,
+    'Permen Mint Pack': 5000,
+    'Kacang Kulit 250g': 11000,
+    'Kacang Tanah 1kg': 22000,
+    'Tepung Maizena 250g': 7000,
+    'Tepung Tapioka 500g': 6000,
+    'Minuman Isotonik Botol': 7000,
+    'Bumbu Nasi Goreng Instan': 3000,
+    'Bumbu Sop Instan': 3000,
+    'Mi Telur 500g': 9000,
+    'Spaghetti 500g': 12000,
+    'Saus Tomat 340g': 9000,
+    'Mayonnaise Sachet 200g': 15000,
+    'Sereal Kotak 200g': 18000,
+    'Susu Bubuk Dewasa 400g': 45000,
+    'Sikat Botol Bayi': 11000,
+    'Popok Bayi (isi 20)': 55000,
+    'Tisu Basah (isi 50)': 12000,
+    'Pembersih Kaca Spray': 15000,
+    'Obat Nyamuk Semprot': 18000,
+    'Obat Nyamuk Bakar Isi 10': 6000,
+    'Korek Api Gas': 5000,
+    'Minyak Kayu Putih 60ml': 15000,
+    'Obat Luka Cair 60ml': 14000,
+    'Vitamin C Strip (isi 10)': 10000,
+    'Masker Sekali Pakai (isi 10)': 9000,
+    'Sabun Cuci Muka 100ml': 20000,
+    'Body Lotion 200ml': 22000,
+    'Bedak Bayi 100g': 8000,
+    'Shampoo Sachet (isi 10)': 10000,
+    'Kapas 100g': 7000,
+    'Minyak Telon 60ml': 16000,
+    'Hand Sanitizer 100ml': 12000,
+    'Botol Minum Plastik 1L': 10000,
+    'Lunch Box Plastik': 13000,
+    'Sendok Garpu Set': 10000,
+    'Wajan Anti Lengket 20cm': 70000,
+    'Rice Cooker Mini': 250000,
+    'Gas Elpiji 3kg': 20000,
+    'Lilin (isi 6)': 6000,
+    'Sapu Ijuk': 15000,
+    'Gelas Plastik Isi 6': 12000,
+    'Plastik Kresek 1kg': 15000
+}
+
+ITEM_NAMES = list(ITEMS_PRICE_MAP.keys())
+CABANG_NAME_SUFFIXES = ["Utama", "Sentra", "Express", "Plus"]
+
+def make_faker_pools(pool_size=DEFAULT_POOL_SIZE, seed=DEFAULT_SEED, locale='id_ID'):
+    """Small pools of Faker values (Indonesian locale) that the generators sample rows from."""
+    fake = Faker(locale)
+    fake.seed_instance(seed)
+    return {
+        "name": [fake.name() for _ in range(pool_size)],
+        "city_name": [fake.city_name() for _ in range(pool_size)],
+        "city": [fake.city() for _ in range(pool_size)],
+        "administrative_unit": [fake.administrative_unit() for _ in range(pool_size)],
+        "street_address": [fake.street_address() for _ in range(pool_size)],
+        "phone_number": [fake.phone_number() for _ in range(pool_size)],
+    }
+
+def _sample(rng, pool, size):
+    return np.asarray(pool, dtype=object)[rng.integers(0, len(pool), size)]
+
+def prefixed_ids(prefix, start, count, width):
+    """e.g. prefixed_ids('TRX', 1, 3, 5) -> ['TRX00001', 'TRX00002', 'TRX00003']"""
+    numbers = np.arange(start, start + count).astype(str)
+    return np.char.add(prefix, np.char.zfill(numbers, width)).astype(object)
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+def random_uuid4_strings(rng, count):
+    """`count` random version-4 UUID strings, built from one block of random bytes."""
+    raw = rng.integers(0, 256, size=(count, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40 # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80 # RFC 4122 variant
+    hex_chars = np.empty((count, 32), dtype=np.uint8)
+    hex_chars[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    hex_chars[:, 1::2] = _HEX_DIGITS[raw & 0x0F]
+    with_dashes = np.insert(hex_chars, [8, 12, 16, 20], ord("-"), axis=1)
+    return with_dashes.view("S36").ravel().astype(str).astype(object)
+
+def generate_cabang(num_cabang, rng, pools):
+    nama_cabang = np.char.add("Cabang ", _sample(rng, pools["city_name"], num_cabang).astype(str))
+    has_suffix = rng.random(num_cabang) < 0.3 # Some variation like "Utama", "Express"
+    suffixes = np.char.add(" ", _sample(rng, CABANG_NAME_SUFFIXES, num_cabang).astype(str))
+    nama_cabang = np.where(has_suffix, np.char.add(nama_cabang, suffixes), nama_cabang)
+    lokasi = (pd.Series(_sample(rng, pools["street_address"], num_cabang)) + ", "
+              + _sample(rng, pools["city"], num_cabang) + ", "
+              + _sample(rng, pools["administrative_unit"], num_cabang))
+    return pd.DataFrame({
+        "id_cabang": prefixed_ids("CB", 1, num_cabang, 3),
+        "nama_cabang": nama_cabang.astype(object),
+        "lokasi": lokasi,
+        "kontak_cabang": _sample(rng, pools["phone_number"], num_cabang),
+    })
+
+def generate_karyawan(num_karyawan, cabang_ids, rng, pools):
+    return pd.DataFrame({
+        "id_karyawan": prefixed_ids("KR", 1, num_karyawan, 4),
+        "nama_karyawan": _sample(rng, pools["name"], num_karyawan),
+        "jabatan": _sample(rng, JABATAN_LIST, num_karyawan),
+        "id_cabang": _sample(rng, cabang_ids, num_karyawan),
+    })
+
+def iter_transaksi_harian_chunks(df_karyawan, num_records, num_events, rng, chunk_rows=DEFAULT_CHUNK_ROWS,
+                                 start_date=TRANSACTION_START_DATE, end_date=TRANSACTION_END_DATE):
+    """
+    Yields transaksi_harian line items `chunk_rows` at a time. `num_events` shopping events
+    (id_transaksi) each get an employee, that employee's branch and a date. The first
+    `num_events` line items give every event one item, the rest go to random events, and
+    rows are shuffled within each chunk. Only per-event arrays are kept between chunks.
+    """
+    karyawan_ids = df_karyawan["id_karyawan"].to_numpy(dtype=object)
+    karyawan_cabang = df_karyawan["id_cabang"].to_numpy(dtype=object)
+    event_karyawan = rng.integers(0, len(karyawan_ids), num_events)
+    event_dates = np.datetime64(start_date, "D") + rng.integers(0, (end_date - start_date).days + 1, num_events)
+    item_names = np.asarray(ITEM_NAMES, dtype=object)
+    item_prices = np.asarray([ITEMS_PRICE_MAP[name] for name in ITEM_NAMES], dtype=np.int32)
+
+    for chunk_start in range(0, num_records, chunk_rows):
+        size = min(chunk_rows, num_records - chunk_start)
+        row_positions = np.arange(chunk_start, chunk_start + size)
+        events = np.where(row_positions < num_events, row_positions, rng.integers(0, num_events, size))
+        events = rng.permutation(events)
+        items = rng.integers(0, len(item_names), size)
+        qty = rng.integers(1, 6, size, dtype=np.int32) # Max 5 items per line item
+        harga_barang = item_prices[items]
+        yield pd.DataFrame({
+            "id_transaksi_harian": random_uuid4_strings(rng, size),
+            "id_transaksi": np.char.add("TRX", np.char.zfill((events + 1).astype(str), 5)).astype(object),
+            "id_cabang": karyawan_cabang[event_karyawan[events]],
+            "id_karyawan": karyawan_ids[event_karyawan[events]],
+            "tanggal": event_dates[events],
+            "nama_barang": item_names[items],
+            "qty": qty,
+            "harga_barang": harga_barang,
+            "total_transaksi": qty * harga_barang,
+        })
+
+def generate_transaksi_harian(df_karyawan, num_records, num_events, rng, **chunk_kwargs):
+    """All line items as one DataFrame; use iter_transaksi_harian_chunks for datasets larger than memory."""
+    return pd.concat(list(iter_transaksi_harian_chunks(df_karyawan, num_records, num_events, rng, **chunk_kwargs)), ignore_index=True)
+
+def generate_dataset(dataset_dir, num_cabang, num_karyawan, num_records, num_events, seed=DEFAULT_SEED,
+                     chunk_rows=DEFAULT_CHUNK_ROWS, pool_size=DEFAULT_POOL_SIZE):
+    """
+    Generates all three entities straight into the Parquet dataset (see grocery_dataset.py),
+    streaming transaksi_harian chunk by chunk. Returns row counts per table.
+    """
+    rng = np.random.default_rng(seed)
+    pools = make_faker_pools(pool_size, seed)
+    df_cabang = generate_cabang(num_cabang, rng, pools)
+    df_karyawan = generate_karyawan(num_karyawan, df_cabang["id_cabang"].to_numpy(), rng, pools)
+    write_table("cabang", df_cabang, dataset_dir)
+    write_table("karyawan", df_karyawan, dataset_dir)
+    write_table_chunks("transaksi_harian", iter_transaksi_harian_chunks(df_karyawan, num_records, num_events, rng, chunk_rows), dataset_dir)
+    return {"cabang": len(df_cabang), "karyawan": len(df_karyawan), "transaksi_harian": num_records}
@@ -0,0 +1,91 @@
+# utils/dataset_bounds.py
+from datetime import datetime
+from utils.cassandra_utils import execute_prepared
+from utils.token_range_scanner import scan_token_ranges
+
+BOUNDS_TABLE = "dataset_bounds"
+
+# One tiny row per dataset (table name), kept up to date by ingestion
+CREATE_BOUNDS_TABLE_CQL = f"""
+CREATE TABLE IF NOT EXISTS {BOUNDS_TABLE} (
+    dataset TEXT PRIMARY KEY,
+    min_tanggal DATE,
+    max_tanggal DATE,
+    updated_at TIMESTAMP
+);
+"""
+
+SELECT_BOUNDS_CQL = f"SELECT min_tanggal, max_tanggal FROM {BOUNDS_TABLE} WHERE dataset = ?"
+DELETE_BOUNDS_CQL = f"DELETE FROM {BOUNDS_TABLE} WHERE dataset = ?"
+UPSERT_BOUNDS_CQL = f"INSERT INTO {BOUNDS_TABLE} (dataset, min_tanggal, max_tanggal, updated_at) VALUES (?, ?, ?, toTimestamp(now()))"
+
+def to_python_date(value):
+    """Converts a cassandra.util.Date (or date/datetime/str) into a datetime.date."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    # cassandra.util.Date's str() form is 'YYYY-MM-DD' for all in-range dates
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+def ensure_bounds_table(session):
+    """Creates the dataset_bounds metadata table if it doesn't exist."""
+    session.execute(CREATE_BOUNDS_TABLE_CQL)
+
+def bounds_table_exists(session):
+    keyspace_meta = session.cluster.metadata.keyspaces.get(session.keyspace)
+    return keyspace_meta is not None and BOUNDS_TABLE in keyspace_meta.tables
+
+def read_dataset_bounds(session, dataset):
+    """Single-partition lookup of (min_date, max_date) for a dataset; (None, None) if unknown."""
+    row = execute_prepared(session, SELECT_BOUNDS_CQL, (dataset,)).one()
+    if row is None or row.min_tanggal is None or row.max_tanggal is None:
+        return None, None
+    return to_python_date(row.min_tanggal), to_python_date(row.max_tanggal)
+
+def update_dataset_bounds(session, dataset, min_date, max_date):
+    """
+    Widens the stored bounds of a dataset to include [min_date, max_date].
+    Called by ingestion after each load, so repeated loads only ever extend the range.
+    """
+    min_date, max_date = to_python_date(min_date), to_python_date(max_date)
+    current_min, current_max = read_dataset_bounds(session, dataset)
+    if current_min is not None:
+        min_date = min(min_date, current_min)
+        max_date = max(max_date, current_max)
+    execute_prepared(session, UPSERT_BOUNDS_CQL, (dataset, min_date, max_date))
+    return min_date, max_date
+
+def clear_dataset_bounds(session, dataset):
+    """Forgets a dataset's bounds, so a restarted load records them from scratch instead of widening old ones."""
+    execute_prepared(session, DELETE_BOUNDS_CQL, (dataset,))
+
+def compute_bounds_by_token_range(session, table, date_column="tanggal", concurrency=8, num_splits=None):
+    """
+    Fallback for tables without metadata: runs MIN/MAX server-side on every token
+    sub-range in parallel, so only one row per range crosses the network.
+    """
+    overall_min, overall_max = None, None
+    columns = [f"MIN({date_column}) AS min_tanggal", f"MAX({date_column}) AS max_tanggal"]
+    for page in scan_token_ranges(session, table, columns, concurrency=concurrency, num_splits=num_splits):
+        for row in page:
+            if row.min_tanggal is None: continue
+            if overall_min is None or row.min_tanggal < overall_min: overall_min = row.min_tanggal
+            if overall_max is None or row.max_tanggal > overall_max: overall_max = row.max_tanggal
+    return to_python_date(overall_min), to_python_date(overall_max)
+
+def get_dataset_bounds(session, dataset):
+    """
+    Returns (min_date, max_date, source). Uses the metadata row when present (one query);
+    otherwise computes the bounds by token range and stores them for the next caller.
+    """
+    has_bounds_table = bounds_table_exists(session)
+    if has_bounds_table:
+        min_date, max_date = read_dataset_bounds(session, dataset)
+        if min_date is not None:
+            return min_date, max_date, "metadata"
+
+    min_date, max_date = compute_bounds_by_token_range(session, dataset)
+    if has_bounds_table and min_date is not None:
+        update_dataset_bounds(session, dataset, min_date, max_date)
+    return min_date, max_date, "token_range_scan"
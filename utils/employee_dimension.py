@@ -0,0 +1,171 @@
+# utils/employee_dimension.py
+import os
+import threading
+import time
+import pandas as pd
+from pymongo.errors import OperationFailure, PyMongoError
+
+DIMENSION_COLUMNS = ['id_karyawan', 'nama_karyawan', 'jabatan']
+DEFAULT_REFRESH_INTERVAL_S = 300
+DEFAULT_FULL_RELOAD_INTERVAL_S = 3600
+WATERMARK_FIELD = "updated_at"
+
+class EmployeeDimension:
+    """
+    In-process copy of the `karyawan` collection (id_karyawan, nama_karyawan, jabatan).
+    Loaded once (from the optional Parquet snapshot when present), then kept current by
+    incremental refreshes at most every `refresh_interval_s`:
+      * a change stream when MongoDB runs as a replica set, otherwise
+      * an `updated_at` watermark query for documents changed since the last refresh.
+    The watermark misses deletes and edits that don't set `updated_at`, so in watermark mode the
+    copy is also fully reloaded from MongoDB every `full_reload_interval_s` and after mark_stale().
+    Between refreshes, lookups are pandas operations with no MongoDB round-trips.
+    """
+    def __init__(self, collection, snapshot_path=None, refresh_interval_s=DEFAULT_REFRESH_INTERVAL_S, use_change_stream=True,
+                 full_reload_interval_s=DEFAULT_FULL_RELOAD_INTERVAL_S):
+        self.collection = collection
+        self.snapshot_path = snapshot_path
+        self.refresh_interval_s = refresh_interval_s
+        self.full_reload_interval_s = full_reload_interval_s
+        self.use_change_stream = use_change_stream
+        self._lock = threading.Lock()
+        self._df = None
+        self._watermark = None
+        self._change_stream = None
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        self._stale = False
+        self.stats = {"full_loads": 0, "refreshes": 0, "rows_refreshed": 0, "source": None, "refresh_mode": None,
+                      "watermark_reloads": 0}
+
+    # ----------------- Loading -----------------
+    def _projection(self):
+        return {"_id": 0, **{column: 1 for column in DIMENSION_COLUMNS}, WATERMARK_FIELD: 1}
+
+    def _frame(self, documents):
+        df = pd.DataFrame(documents, columns=DIMENSION_COLUMNS + [WATERMARK_FIELD])
+        return df.drop_duplicates('id_karyawan', keep='last').set_index('id_karyawan', drop=False)
+
+    def _open_change_stream(self):
+        # Opened before the full load, so changes made during the load are not missed
+        if not self.use_change_stream:
+            return None
+        try:
+            return self.collection.watch(full_document="updateLookup")
+        except (OperationFailure, PyMongoError):
+            return None # Standalone servers have no change streams; use the watermark instead
+
+    def _load(self, use_snapshot=True):
+        self._change_stream = self._open_change_stream()
+        from_snapshot = use_snapshot and self.snapshot_path and os.path.exists(self.snapshot_path)
+        if from_snapshot:
+            self._df = self._frame(pd.read_parquet(self.snapshot_path))
+            self._update_watermark()
+            self.stats["source"] = "snapshot"
+        if from_snapshot and self._watermark is not None:
+            self._refresh_from_watermark() # Catch up on changes made since the snapshot was written
+        else:
+            # No snapshot, or one without updated_at values to catch up from
+            self._df = self._frame(list(self.collection.find({}, self._projection())))
+            self._update_watermark()
+            self.stats["source"] = "mongodb"
+        self.stats["full_loads"] += 1
+        self.stats["refresh_mode"] = "change_stream" if self._change_stream is not None else "watermark"
+        self._save_snapshot()
+        self._last_refresh = self._last_full_load = time.monotonic()
+        self._stale = False
+
+    def _update_watermark(self):
+        watermarks = self._df[WATERMARK_FIELD].dropna()
+        self._watermark = watermarks.max() if not watermarks.empty else None
+
+    def _save_snapshot(self):
+        if self.snapshot_path:
+            self._df.reset_index(drop=True).to_parquet(self.snapshot_path, index=False)
+
+    # ----------------- Incremental Refresh -----------------
+    def _apply_changes(self, documents, deleted_ids=()):
+        if documents:
+            changed = self._frame(documents)
+            self._df = pd.concat([self._df.drop(changed.index, errors='ignore'), changed])
+        if deleted_ids:
+            self._df = self._df.drop(list(deleted_ids), errors='ignore')
+        self.stats["rows_refreshed"] += len(documents) + len(deleted_ids)
+        return len(documents) + len(deleted_ids)
+
+    def _refresh_from_change_stream(self):
+        documents, deleted_keys = [], []
+        while True:
+            change = self._change_stream.try_next()
+            if change is None:
+                break
+            if change["operationType"] in ("insert", "update", "replace") and change.get("fullDocument"):
+                documents.append({key: change["fullDocument"].get(key) for key in DIMENSION_COLUMNS + [WATERMARK_FIELD]})
+            elif change["operationType"] == "delete":
+                deleted_keys.append(change["documentKey"]["_id"])
+        # Documents are ingested with _id = id_karyawan, so delete events map straight to the index
+        return self._apply_changes(documents, deleted_keys)
+
+    def _refresh_from_watermark(self):
+        if self._watermark is None:
+            return 0 # Documents carry no updated_at: only a full reload can pick up changes
+        documents = list(self.collection.find({WATERMARK_FIELD: {"$gt": self._watermark}}, self._projection()))
+        changed_count = self._apply_changes(documents)
+        self._update_watermark()
+        return changed_count
+
+    def refresh(self, force=False):
+        """Applies changes made in MongoDB since the last refresh. Returns the number of changed rows."""
+        with self._lock:
+            if self._df is None:
+                self._load()
+                return 0
+            if self._change_stream is None and (self._stale or time.monotonic() - self._last_full_load >= self.full_reload_interval_s):
+                # The watermark can't see deletes or edits without updated_at: replace the copy from MongoDB
+                self.stats["watermark_reloads"] += 1
+                self._load(use_snapshot=False)
+                return 0
+            if not force and time.monotonic() - self._last_refresh < self.refresh_interval_s:
+                return 0
+            try:
+                changed_count = self._refresh_from_change_stream() if self._change_stream is not None else self._refresh_from_watermark()
+            except PyMongoError:
+                # e.g. the change stream's resume point fell off the oplog: start over
+                self._change_stream = None
+                self._df = None
+                self._load()
+                return 0
+            self.stats["refreshes"] += 1
+            self._last_refresh = time.monotonic()
+            if changed_count:
+                self._save_snapshot()
+            return changed_count
+
+    def mark_stale(self):
+        """
+        Flags the copy as possibly out of date (e.g. after the Playground wrote to `karyawan`), so the
+        next lookup reloads it in watermark mode. Change streams already see every write.
+        """
+        with self._lock:
+            self._stale = True
+
+    def reload(self):
+        """Discards the cached copy and loads `karyawan` from MongoDB again."""
+        with self._lock:
+            if self._change_stream is not None:
+                self._change_stream.close()
+            self._df = None
+            if self.snapshot_path and os.path.exists(self.snapshot_path):
+                os.remove(self.snapshot_path)
+        self.refresh()
+
+    # ----------------- Lookups -----------------
+    def lookup(self, employee_ids):
+        """Name and jabatan for the given id_karyawan values, same shape as query_executors.fetch_employee_details."""
+        self.refresh()
+        with self._lock:
+            found = self._df.loc[self._df.index.intersection(pd.Index(employee_ids).unique()), DIMENSION_COLUMNS]
+        return found.reset_index(drop=True)
+
+    def __len__(self):
+        return 0 if self._df is None else len(self._df)
@@ -0,0 +1,111 @@
+# utils/grocery_dataset.py
+# Parquet hand-off between the generator notebook (01) and the ingestion notebook (02).
+# Each entity is one Parquet file under the dataset directory, written with explicit
+# dtypes so nothing is re-inferred on the way back in.
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_DATASET_DIR = "grocery_dataset"
+DEFAULT_ROW_GROUP_ROWS = 100_000
+
+# Low-cardinality text columns are dictionary-encoded (pandas categoricals)
+SCHEMAS = {
+    "cabang": pa.schema([
+        ("id_cabang", pa.string()),
+        ("nama_cabang", pa.string()),
+        ("lokasi", pa.string()),
+        ("kontak_cabang", pa.string()),
+    ]),
+    "karyawan": pa.schema([
+        ("id_karyawan", pa.string()),
+        ("nama_karyawan", pa.string()),
+        ("jabatan", pa.dictionary(pa.int8(), pa.string())),
+        ("id_cabang", pa.string()),
+    ]),
+    "transaksi_harian": pa.schema([
+        ("id_transaksi_harian", pa.string()),
+        ("id_transaksi", pa.string()),
+        ("id_cabang", pa.string()),
+        ("id_karyawan", pa.string()),
+        ("tanggal", pa.date32()),
+        ("nama_barang", pa.dictionary(pa.int16(), pa.string())),
+        ("qty", pa.int32()),
+        ("harga_barang", pa.int32()),
+        ("total_transaksi", pa.int32()), # Cassandra INT on the other side
+    ]),
+}
+
+def table_path(name, dataset_dir=None):
+    return os.path.join(dataset_dir or DEFAULT_DATASET_DIR, f"{name}.parquet")
+
+def _to_arrow(df, schema):
+    """Coerces a DataFrame to `schema` (column order, dates, int widths, categoricals) as an Arrow table."""
+    df = df[schema.names].copy()
+    for field in schema:
+        if pa.types.is_date32(field.type):
+            df[field.name] = pd.to_datetime(df[field.name]).dt.date
+        elif pa.types.is_integer(field.type):
+            df[field.name] = df[field.name].astype(field.type.to_pandas_dtype())
+        elif pa.types.is_dictionary(field.type):
+            df[field.name] = df[field.name].astype(str).astype("category")
+        else:
+            df[field.name] = df[field.name].astype(str)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+def write_table(name, df, dataset_dir=None, row_group_rows=DEFAULT_ROW_GROUP_ROWS):
+    """Writes one entity's DataFrame to <dataset_dir>/<name>.parquet. Returns the file path."""
+    return write_table_chunks(name, [df], dataset_dir, row_group_rows)
+
+def write_table_chunks(name, df_chunks, dataset_dir=None, row_group_rows=DEFAULT_ROW_GROUP_ROWS):
+    """
+    Streams an iterable of DataFrame chunks into a single Parquet file, so a table larger
+    than memory can be generated piece by piece. Returns the file path.
+    """
+    path = table_path(name, dataset_dir)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    schema = SCHEMAS[name]
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for df_chunk in df_chunks:
+            if len(df_chunk):
+                writer.write_table(_to_arrow(df_chunk, schema), row_group_size=row_group_rows)
+    return path
+
+def _dictionary_columns(name):
+    return [field.name for field in SCHEMAS[name] if pa.types.is_dictionary(field.type)]
+
+def read_table(name, dataset_dir=None, columns=None):
+    """Reads a whole entity back as a DataFrame (dates as datetime.date, categoricals kept)."""
+    return pq.read_table(table_path(name, dataset_dir), columns=columns).to_pandas()
+
+def iter_table_batches(name, dataset_dir=None, batch_rows=DEFAULT_ROW_GROUP_ROWS, columns=None, start_row=0):
+    """
+    Yields the entity as DataFrames of at most `batch_rows` rows, reading lazily row group by row group.
+    With `start_row`, row groups that end before it are skipped without being read (used to resume ingestion).
+    """
+    # Same dictionary columns as read_table, so streamed batches come back as categoricals too
+    parquet_file = pq.ParquetFile(table_path(name, dataset_dir), read_dictionary=_dictionary_columns(name))
+    row_groups, first_group_start, group_start = [], None, 0
+    for index in range(parquet_file.metadata.num_row_groups):
+        group_rows = parquet_file.metadata.row_group(index).num_rows
+        if group_start + group_rows > start_row:
+            row_groups.append(index)
+            if first_group_start is None: first_group_start = group_start
+        group_start += group_rows
+    if not row_groups:
+        return
+    rows_to_skip = start_row - first_group_start
+    for record_batch in parquet_file.iter_batches(batch_size=batch_rows, row_groups=row_groups, columns=columns):
+        if rows_to_skip >= record_batch.num_rows:
+            rows_to_skip -= record_batch.num_rows
+            continue
+        yield record_batch.slice(rows_to_skip).to_pandas()
+        rows_to_skip = 0
+
+def table_row_count(name, dataset_dir=None):
+    """Row count from the Parquet footer, without reading any data."""
+    return pq.ParquetFile(table_path(name, dataset_dir)).metadata.num_rows
+
+def dataset_exists(dataset_dir=None):
+    return all(os.path.exists(table_path(name, dataset_dir)) for name in SCHEMAS)
@@ -0,0 +1,121 @@
+# utils/load_generator.py
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+# start: seconds since the test began, latency: seconds, ok: False when the operation raised
+LoadSample = namedtuple('LoadSample', ['start', 'latency', 'ok', 'error'])
+# Error recorded for open-loop requests that were never sent because the backlog was full
+DROPPED_ERROR = "Dropped: open-loop backlog full"
+
+def _timed_call(operation, test_start, scheduled_start=None):
+    """
+    Runs one operation and returns its LoadSample. For open-loop tests latency is
+    measured from the scheduled start, so time spent queued behind slow requests
+    counts against the system instead of being silently dropped.
+    """
+    actual_start = time.perf_counter()
+    measured_from = scheduled_start if scheduled_start is not None else actual_start
+    try:
+        operation()
+        return LoadSample(measured_from - test_start, time.perf_counter() - measured_from, True, None)
+    except Exception as e:
+        return LoadSample(measured_from - test_start, time.perf_counter() - measured_from, False, f"{type(e).__name__}: {e}")
+
+def run_closed_loop(operation, concurrency: int, duration_s: float):
+    """
+    `concurrency` workers each call `operation` back to back until `duration_s` elapses.
+    Measures how much throughput the target sustains at a fixed number of in-flight requests.
+    """
+    samples, samples_lock = [], threading.Lock()
+    test_start = time.perf_counter()
+    deadline = test_start + duration_s
+
+    def worker():
+        local_samples = []
+        while time.perf_counter() < deadline:
+            local_samples.append(_timed_call(operation, test_start))
+        with samples_lock:
+            samples.extend(local_samples)
+
+    threads = [threading.Thread(target=worker, name=f"load-closed-{i}", daemon=True) for i in range(concurrency)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    return sorted(samples, key=lambda sample: sample.start), time.perf_counter() - test_start
+
+def run_open_loop(operation, target_qps: float, duration_s: float, max_workers: int = 64, max_backlog: int = None):
+    """
+    Issues requests on a fixed schedule of `target_qps` per second for `duration_s`,
+    whether or not earlier requests have finished (up to `max_workers` in flight).
+    At most `max_backlog` requests (default 2 x max_workers) may be running or waiting for a
+    worker; a scheduled request that finds the backlog full is not queued but recorded as a
+    failed DROPPED_ERROR sample, so a server that falls behind can't grow the queue without bound.
+    Samples are collected as requests complete, so no per-request futures are kept.
+    """
+    max_backlog = max_backlog or 2 * max_workers
+    backlog_slots = threading.BoundedSemaphore(max_backlog)
+    samples, samples_lock = [], threading.Lock()
+
+    def collect(future):
+        with samples_lock:
+            samples.append(future.result())
+        backlog_slots.release()
+
+    test_start = time.perf_counter()
+    interval = 1.0 / target_qps
+    total_requests = int(target_qps * duration_s)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load-open") as executor:
+        for request_index in range(total_requests):
+            scheduled_start = test_start + request_index * interval
+            sleep_for = scheduled_start - time.perf_counter()
+            if sleep_for > 0:
+                time.sleep(sleep_for)
+            if not backlog_slots.acquire(blocking=False):
+                with samples_lock:
+                    samples.append(LoadSample(scheduled_start - test_start, 0.0, False, DROPPED_ERROR))
+                continue
+            executor.submit(_timed_call, operation, test_start, scheduled_start).add_done_callback(collect)
+    return sorted(samples, key=lambda sample: sample.start), time.perf_counter() - test_start
+
+def summarize_load_test(samples, elapsed_s: float):
+    """
+    Overall throughput, error rate and latency percentiles (successful requests only, in seconds).
+    Dropped open-loop requests count as errors and are also reported on their own.
+    """
+    successful = np.asarray([sample.latency for sample in samples if sample.ok], dtype=float)
+    error_count = sum(1 for sample in samples if not sample.ok)
+    summary = {
+        "requests": len(samples),
+        "errors": error_count,
+        "dropped": sum(1 for sample in samples if sample.error == DROPPED_ERROR),
+        "error_rate": error_count / len(samples) if samples else 0.0,
+        "elapsed_s": elapsed_s,
+        "throughput_ops": len(successful) / elapsed_s if elapsed_s > 0 else 0.0,
+    }
+    for label, percentile in (("p50", 50), ("p95", 95), ("p99", 99)):
+        summary[label] = float(np.percentile(successful, percentile)) if successful.size else 0.0
+    summary["max"] = float(successful.max()) if successful.size else 0.0
+    summary["first_error"] = next((sample.error for sample in samples if not sample.ok and sample.error != DROPPED_ERROR), None)
+    return summary
+
+def load_timeline(samples, bucket_s: float = 1.0):
+    """
+    Per-interval view of a load test, bucketed by request start time:
+    completed ops/s, error rate and p50/p95 latency in milliseconds.
+    """
+    if not samples:
+        return pd.DataFrame()
+    df = pd.DataFrame(samples, columns=LoadSample._fields)
+    df['bucket'] = (df['start'] // bucket_s) * bucket_s
+    grouped = df.groupby('bucket')
+    timeline = pd.DataFrame({
+        'Throughput (ops/s)': grouped['ok'].sum() / bucket_s,
+        'Error Rate (%)': (1 - grouped['ok'].mean()) * 100,
+        'p50 (ms)': df[df['ok']].groupby('bucket')['latency'].median() * 1000,
+        'p95 (ms)': df[df['ok']].groupby('bucket')['latency'].quantile(0.95) * 1000,
+    })
+    timeline.index.name = 'Elapsed (s)'
+    return timeline.fillna(0.0)
@@ -0,0 +1,81 @@
+# utils/mongo_bulk.py
+# Mixed bulk writes for the MongoDB Playground: a JSON array of shell-style operations
+# ({"updateMany": {"filter": ..., "update": ...}}, ...) sent as one bulk_write, with a per-operation summary.
+import time
+import pandas as pd
+from pymongo import InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany
+from pymongo.errors import BulkWriteError
+
+# Operation name -> (pymongo request class, required fields, optional fields)
+BULK_OPERATIONS = {
+    "insertOne": (InsertOne, ["document"], []),
+    "updateOne": (UpdateOne, ["filter", "update"], ["upsert", "hint"]),
+    "updateMany": (UpdateMany, ["filter", "update"], ["upsert", "hint"]),
+    "replaceOne": (ReplaceOne, ["filter", "replacement"], ["upsert", "hint"]),
+    "deleteOne": (DeleteOne, ["filter"], ["hint"]),
+    "deleteMany": (DeleteMany, ["filter"], ["hint"]),
+}
+
+def parse_bulk_operations(operations):
+    """
+    Turns [{"<operation>": {<arguments>}}, ...] into pymongo write requests.
+    Returns (requests, operation names). Raises ValueError naming the offending position.
+    """
+    if not isinstance(operations, list): raise ValueError("Bulk operations must be a JSON array.")
+    if not operations: raise ValueError("Bulk operations list is empty.")
+    requests, names = [], []
+    for position, operation in enumerate(operations):
+        if not isinstance(operation, dict) or len(operation) != 1:
+            raise ValueError(f"Operation {position} must be an object with a single key, e.g. {{\"insertOne\": {{\"document\": {{...}}}}}}.")
+        name, arguments = next(iter(operation.items()))
+        if name not in BULK_OPERATIONS:
+            raise ValueError(f"Operation {position}: unsupported '{name}' (use one of {', '.join(BULK_OPERATIONS)}).")
+        request_class, required, optional = BULK_OPERATIONS[name]
+        if not isinstance(arguments, dict): raise ValueError(f"Operation {position} ({name}): arguments must be an object.")
+        missing = [field for field in required if field not in arguments]
+        if missing: raise ValueError(f"Operation {position} ({name}): missing {', '.join(missing)}.")
+        unknown = [field for field in arguments if field not in required + optional]
+        if unknown: raise ValueError(f"Operation {position} ({name}): unknown field(s) {', '.join(unknown)}.")
+        requests.append(request_class(*[arguments[field] for field in required], **{field: arguments[field] for field in optional if field in arguments}))
+        names.append(name)
+    return requests, names
+
+def run_bulk_write(collection, operations, ordered=True):
+    """
+    Sends all operations in one bulk_write. Ordered mode stops at the first failing operation;
+    unordered mode lets the server run the rest (and possibly reorder them).
+    Returns (summary dict with counts, elapsed_s and ops_per_s, per-operation DataFrame).
+    """
+    requests, names = parse_bulk_operations(operations)
+    write_errors, details = {}, None
+    start_time = time.perf_counter()
+    try:
+        details = collection.bulk_write(requests, ordered=ordered).bulk_api_result
+    except BulkWriteError as e:
+        details = e.details # Counts for what did run, plus the writeErrors (by operation index)
+        write_errors = {error["index"]: error.get("errmsg", str(error)) for error in details.get("writeErrors", [])}
+    elapsed_s = time.perf_counter() - start_time
+
+    upserted_ids = {upsert["index"]: upsert["_id"] for upsert in details.get("upserted", [])}
+    first_error = min(write_errors) if write_errors else None
+    rows = []
+    for position, name in enumerate(names):
+        if position in write_errors: status = f"error: {write_errors[position]}"
+        elif ordered and first_error is not None and position > first_error: status = "not executed"
+        else: status = "ok"
+        rows.append({"index": position, "operation": name, "status": status,
+                     "upserted_id": str(upserted_ids[position]) if position in upserted_ids else None})
+
+    summary = {
+        "operations": len(requests),
+        "ordered": ordered,
+        "inserted": details.get("nInserted", 0),
+        "matched": details.get("nMatched", 0),
+        "modified": details.get("nModified", 0),
+        "deleted": details.get("nRemoved", 0),
+        "upserted": details.get("nUpserted", 0),
+        "errors": len(write_errors),
+        "elapsed_s": elapsed_s,
+        "ops_per_s": len(requests) / elapsed_s if elapsed_s > 0 else 0.0,
+    }
+    return summary, pd.DataFrame(rows, columns=["index", "operation", "status", "upserted_id"])
@@ -0,0 +1,90 @@
+# utils/mongo_ingest.py
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import WriteConcern
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY_ERROR = 11000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_WORKERS = 4
+# Bulk loads favour throughput: acknowledged by the primary, without waiting for the journal
+BULK_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
+def dataframe_to_documents(df_chunk, id_column=None, timestamp_field=None):
+    """
+    Records for insert_many, with `id_column` copied to `_id` so re-inserting a row is a no-op.
+    With `timestamp_field`, every document is stamped with the load time (UTC), which readers
+    such as employee_dimension.py use as a watermark for incremental refreshes.
+    """
+    documents = df_chunk.to_dict(orient="records")
+    loaded_at = datetime.now(timezone.utc)
+    for document in documents:
+        if id_column: document["_id"] = document[id_column]
+        if timestamp_field: document[timestamp_field] = loaded_at
+    return documents
+
+def _insert_batch(collection, documents):
+    """One unordered insert_many. Duplicate-key errors count as already written. Returns (failed, inserted, first_error)."""
+    try:
+        return 0, len(collection.insert_many(documents, ordered=False).inserted_ids), None
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        real_errors = [error for error in write_errors if error.get("code") != DUPLICATE_KEY_ERROR]
+        first_error = real_errors[0].get("errmsg") if real_errors else None
+        return len(real_errors), e.details.get("nInserted", 0), first_error
+
+def bulk_insert(collections, documents, batch_size=DEFAULT_BATCH_SIZE, max_workers=DEFAULT_MAX_WORKERS,
+                write_concern=BULK_WRITE_CONCERN):
+    """
+    Splits `documents` into batches and inserts every batch into every collection with
+    unordered insert_many calls spread over a thread pool. The documents are converted once
+    and shared between collections, so they must already carry their `_id`.
+    Returns (failed_count, inserted_count, first_error), counted over all collections.
+    """
+    if not documents:
+        return 0, 0, None
+    targets = [collection.with_options(write_concern=write_concern) if write_concern else collection for collection in collections]
+    batches = [documents[start:start + batch_size] for start in range(0, len(documents), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongo-bulk") as executor:
+        results = list(executor.map(lambda job: _insert_batch(*job), [(target, batch) for target in targets for batch in batches]))
+    first_error = next((error for _, _, error in results if error), None)
+    return sum(failed for failed, _, _ in results), sum(inserted for _, inserted, _ in results), first_error
+
+def insert_chunk(collections, df_chunk, id_column=None, batch_size=DEFAULT_BATCH_SIZE, max_workers=DEFAULT_MAX_WORKERS,
+                 write_concern=BULK_WRITE_CONCERN, timestamp_field=None):
+    """
+    Inserts a DataFrame chunk into one collection or a list of collections (see bulk_insert).
+    Duplicate-key errors are ignored, so a chunk that was partly written before a crash can
+    simply be sent again. Returns (failed_count, inserted_count, first_error).
+    """
+    if isinstance(collections, Collection):
+        collections = [collections]
+    documents = dataframe_to_documents(df_chunk, id_column, timestamp_field)
+    if id_column is None and len(collections) > 1:
+        # insert_many assigns ObjectIds in place; give each collection its own copies
+        results = [bulk_insert([collection], [dict(document) for document in documents], batch_size, max_workers, write_concern)
+                   for collection in collections]
+        first_error = next((error for _, _, error in results if error), None)
+        return sum(failed for failed, _, _ in results), sum(inserted for _, inserted, _ in results), first_error
+    return bulk_insert(collections, documents, batch_size, max_workers, write_concern)
+
+# ----------------- Secondary Indexes -----------------
+def create_indexes(collection, index_specs):
+    """
+    Builds each (keys, name) index in `index_specs` and returns the seconds spent.
+    Called once after a bulk load, this builds every index in a single pass over the data
+    instead of updating it for every inserted document.
+    """
+    start_time = time.perf_counter()
+    for keys, name in index_specs:
+        collection.create_index(keys, name=name)
+    return time.perf_counter() - start_time
+
+def drop_secondary_indexes(collection):
+    """Drops every index except _id (e.g. before a full reload). Returns the dropped index names."""
+    dropped = [index["name"] for index in collection.list_indexes() if index["name"] != "_id_"]
+    for name in dropped:
+        collection.drop_index(name)
+    return dropped
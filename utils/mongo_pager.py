@@ -0,0 +1,92 @@
+# utils/mongo_pager.py
+# Page-at-a-time reads for the MongoDB Playground: only the visible page is fetched and kept,
+# and the full result can be streamed to a JSON Lines file instead of being held in memory.
+import os
+from bson import json_util
+from utils.query_executors import RAW_CODEC_OPTIONS
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_EXPORT_DIR = "exports"
+
+def new_pager(kind, query, page_size=DEFAULT_PAGE_SIZE, cursor_options=None, allow_disk_use=True):
+    """
+    Pager state for a 'find' (query = filter) or 'aggregate' (query = pipeline), kept as a plain
+    dict in session state. `page_starts[n]` holds the last _id before page n (keyset paging), so
+    only one _id per visited page is remembered, never the documents themselves.
+    """
+    return {"kind": kind, "query": query, "page_size": int(page_size), "cursor_options": dict(cursor_options or {}),
+            "allow_disk_use": allow_disk_use, "page_number": 0, "page_starts": [None], "has_more": False}
+
+def uses_keyset(pager):
+    # Keyset paging walks the _id index in order; a custom sort order needs skip-based paging instead
+    return pager["kind"] == "find" and "sort" not in pager["cursor_options"]
+
+def _page_limit(pager, page_number):
+    """Rows to show on `page_number`, honouring a total `limit` from the cursor options (0 = past the end)."""
+    total_limit = pager["cursor_options"].get("limit")
+    if total_limit is None:
+        return pager["page_size"]
+    return max(0, min(pager["page_size"], total_limit - page_number * pager["page_size"]))
+
+def _find_page(collection, pager, page_number, page_limit):
+    options = dict(pager["cursor_options"])
+    options.pop("limit", None)
+    if options.pop("raw_bson", False):
+        collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+    if uses_keyset(pager):
+        projection = options.get("projection")
+        if projection is not None and projection.get("_id") in (0, False):
+            options["projection"] = {key: value for key, value in projection.items() if key != "_id"} or None # _id is the page key
+        after_id = pager["page_starts"][page_number]
+        page_filter = pager["query"] if after_id is None else {"$and": [pager["query"], {"_id": {"$gt": after_id}}]}
+        return list(collection.find(page_filter, sort=[("_id", 1)], limit=page_limit + 1, **options))
+    return list(collection.find(pager["query"], skip=page_number * pager["page_size"], limit=page_limit + 1, **options))
+
+def _aggregate_page(collection, pager, page_number, page_limit):
+    options = pager["cursor_options"]
+    aggregate_options = {"allowDiskUse": pager["allow_disk_use"]}
+    if "batch_size" in options: aggregate_options["batchSize"] = options["batch_size"]
+    if "hint" in options: aggregate_options["hint"] = options["hint"]
+    page_stages = [{"$skip": page_number * pager["page_size"]}, {"$limit": page_limit + 1}]
+    return list(collection.aggregate(list(pager["query"]) + page_stages, **aggregate_options))
+
+def fetch_page(collection, pager, page_number):
+    """
+    Fetches page `page_number` (the first page, or one already reached by paging forward, or the
+    next one) and updates `pager` in place. One extra document is read to know whether a next page exists.
+    Returns the page's documents.
+    """
+    if page_number < 0 or page_number >= len(pager["page_starts"]):
+        raise ValueError(f"Page {page_number + 1} can only be reached by paging forward.")
+    page_limit = _page_limit(pager, page_number)
+    documents = []
+    if page_limit > 0:
+        fetch = _find_page if pager["kind"] == "find" else _aggregate_page
+        documents = fetch(collection, pager, page_number, page_limit)
+    pager["has_more"] = len(documents) > page_limit and _page_limit(pager, page_number + 1) > 0
+    documents = documents[:page_limit]
+    pager["page_number"] = page_number
+    if pager["has_more"] and len(pager["page_starts"]) == page_number + 1:
+        pager["page_starts"].append(documents[-1]["_id"] if uses_keyset(pager) else None)
+    return documents
+
+def export_results(collection, pager, path):
+    """
+    Streams the pager's full result to `path` as JSON Lines (Extended JSON, so ObjectIds and dates
+    round-trip), one driver batch at a time. Returns the number of documents written.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    options = {key: value for key, value in pager["cursor_options"].items() if key != "raw_bson"}
+    if pager["kind"] == "find":
+        cursor = collection.find(pager["query"], **options)
+    else:
+        aggregate_options = {"allowDiskUse": pager["allow_disk_use"]}
+        if "batch_size" in options: aggregate_options["batchSize"] = options["batch_size"]
+        if "hint" in options: aggregate_options["hint"] = options["hint"]
+        cursor = collection.aggregate(pager["query"], **aggregate_options)
+    written = 0
+    with open(path, "w", encoding="utf-8") as export_file:
+        for document in cursor:
+            export_file.write(json_util.dumps(document) + "\n")
+            written += 1
+    return written
@@ -0,0 +1,137 @@
+# utils/mongo_profiling.py
+# Where a MongoDB benchmark query spends its time: the server's executionStats from explain,
+# and the client-side phases (round-trip, cursor drain, BSON decode, DataFrame build) timed apart.
+import time
+from itertools import islice
+import bson
+from utils.query_executors import RAW_CODEC_OPTIONS, documents_to_dataframe
+
+# ----------------- Server Side: explain -----------------
+def _hint_value(hint):
+    # Key specs arrive as [(field, direction), ...]; commands take them as an ordered document
+    return dict(hint) if isinstance(hint, list) else hint
+
+def explain_command(collection, operation_type: str, query_params, cursor_options=None):
+    """
+    The explain-able command the benchmark operation sends, with the same cursor_options applied
+    as query_executors.run_mongodb_benchmark_operation (count_documents runs as a $match/$group pipeline).
+    """
+    options = cursor_options or {}
+    if operation_type == 'Find':
+        command = {"find": collection.name, "filter": query_params}
+        if "projection" in options: command["projection"] = options["projection"]
+        if "sort" in options: command["sort"] = dict(options["sort"])
+        if "limit" in options: command["limit"] = options["limit"]
+        if "batch_size" in options: command["batchSize"] = options["batch_size"]
+    elif operation_type == 'Aggregate':
+        command = {"aggregate": collection.name, "pipeline": query_params, "cursor": {}}
+        if "batch_size" in options: command["cursor"] = {"batchSize": options["batch_size"]}
+    elif operation_type == 'Count Documents':
+        limit_stage = [{"$limit": options["limit"]}] if "limit" in options else []
+        command = {"aggregate": collection.name, "pipeline": [{"$match": query_params}] + limit_stage + [{"$group": {"_id": 1, "n": {"$sum": 1}}}], "cursor": {}}
+    else:
+        raise ValueError(f"Unsupported benchmark operation: {operation_type}")
+    if "hint" in options: command["hint"] = _hint_value(options["hint"])
+    return command
+
+def _find_key(document, key):
+    """First value stored under `key` anywhere in a nested explain document (aggregate explains nest it under $cursor)."""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        children = document.values()
+    elif isinstance(document, list):
+        children = document
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+def _plan_stages(plan, stages=None, index_names=None):
+    # Depth-first walk over a winning plan: inputStage(s), and queryPlan for slot-based (SBE) plans
+    stages, index_names = (stages if stages is not None else []), (index_names if index_names is not None else [])
+    if isinstance(plan, dict):
+        if "stage" in plan: stages.append(plan["stage"])
+        if "indexName" in plan: index_names.append(plan["indexName"])
+        for child_key in ("queryPlan", "inputStage", "inputStages", "shards"):
+            if child_key in plan:
+                _plan_stages(plan[child_key], stages, index_names)
+    elif isinstance(plan, list):
+        for child in plan:
+            _plan_stages(child, stages, index_names)
+    return stages, index_names
+
+def summarize_explain(explain_document):
+    """
+    Flattens an explain("executionStats") result: winning plan stages, scan type
+    (COLLSCAN / IXSCAN / ...), indexes used and the executionStats counters.
+    """
+    execution_stats = _find_key(explain_document, "executionStats") or {}
+    stages, index_names = _plan_stages(_find_key(explain_document, "winningPlan") or {})
+    scan_types = [stage for stage in stages if stage in ("COLLSCAN", "IXSCAN", "COUNT_SCAN", "IDHACK", "EXPRESS_IXSCAN")]
+    return {
+        "winning_plan": " > ".join(stages) or "-",
+        "scan_type": ", ".join(dict.fromkeys(scan_types)) or "-",
+        "indexes_used": ", ".join(dict.fromkeys(index_names)) or "-",
+        "n_returned": execution_stats.get("nReturned"),
+        "docs_examined": execution_stats.get("totalDocsExamined"),
+        "keys_examined": execution_stats.get("totalKeysExamined"),
+        "execution_time_ms": execution_stats.get("executionTimeMillis"),
+    }
+
+def explain_operation(collection, operation_type: str, query_params, cursor_options=None):
+    """Runs the operation under explain with executionStats verbosity (the query really executes once more)."""
+    explain_document = collection.database.command("explain", explain_command(collection, operation_type, query_params, cursor_options),
+                                                    verbosity="executionStats")
+    return summarize_explain(explain_document)
+
+# ----------------- Client Side: phase timing -----------------
+def _open_cursor(collection, operation_type, query_params, options):
+    if operation_type == 'Find':
+        if not isinstance(query_params, dict): raise ValueError("Filter for Find must be a JSON object.")
+        return collection.find(query_params, **options)
+    if not isinstance(query_params, list): raise ValueError("Pipeline for Aggregate must be a JSON array.")
+    aggregate_options = {"batchSize": options["batch_size"]} if "batch_size" in options else {}
+    if "hint" in options: aggregate_options["hint"] = options["hint"]
+    return collection.aggregate(query_params, **aggregate_options)
+
+def profile_operation(collection, operation_type: str, query_params, cursor_options=None):
+    """
+    Runs the operation once with documents kept as undecoded RawBSONDocuments, so each phase is timed on its own:
+      * "Round-trip": sending the command and receiving the first batch
+      * "Cursor drain": fetching the remaining batches (getMore)
+      * "BSON decode": decoding the raw documents into dicts
+      * "DataFrame build": documents_to_dataframe
+    `cursor_options` apply as in query_executors.run_mongodb_benchmark_operation (raw_bson is implied).
+    Returns (DataFrame, {phase: seconds}).
+    """
+    options = {key: value for key, value in (cursor_options or {}).items() if key != "raw_bson"}
+    raw_collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+    if operation_type == 'Count Documents':
+        # A single command with a single number back: everything is round-trip
+        if not isinstance(query_params, dict): raise ValueError("Filter for Count Documents must be a JSON object.")
+        start_time = time.perf_counter()
+        count_options = {key: options[key] for key in ("limit", "hint") if key in options}
+        documents = [{"count": collection.count_documents(query_params, **count_options)}]
+        round_trip_s, drain_s = time.perf_counter() - start_time, 0.0
+    else:
+        start_time = time.perf_counter()
+        cursor = _open_cursor(raw_collection, operation_type, query_params, options)
+        raw_documents = list(islice(cursor, 1)) # find() is lazy: pulling the first document sends the query
+        round_trip_s = time.perf_counter() - start_time
+        drain_start = time.perf_counter()
+        raw_documents.extend(cursor)
+        drain_s = time.perf_counter() - drain_start
+
+    decode_start = time.perf_counter()
+    if operation_type != 'Count Documents':
+        documents = [bson.decode(raw_document.raw) for raw_document in raw_documents]
+    decode_s = time.perf_counter() - decode_start
+
+    frame_start = time.perf_counter()
+    df = documents_to_dataframe(documents)
+    dataframe_s = time.perf_counter() - frame_start
+    return df, {"Round-trip": round_trip_s, "Cursor drain": drain_s, "BSON decode": decode_s, "DataFrame build": dataframe_s}
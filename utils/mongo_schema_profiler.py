@@ -0,0 +1,150 @@
+# utils/mongo_schema_profiler.py
+# Sampled schema inference for the Playground's Database and Collection Inspector:
+# field presence, type distribution and cardinality from a $sample, plus storage stats
+# and indexes, cached per collection with a TTL so reruns don't go back to MongoDB.
+import threading
+import time
+from collections import Counter
+import pandas as pd
+from pymongo.errors import OperationFailure
+
+DEFAULT_SAMPLE_SIZE = 500
+DEFAULT_TTL_S = 300
+STORAGE_STAT_FIELDS = ["count", "size", "storageSize", "avgObjSize", "nindexes", "totalIndexSize"]
+
+def _type_name(value):
+    if value is None:
+        return "null"
+    if isinstance(value, list):
+        element_types = sorted({_type_name(element) for element in value})
+        return f"array<{'|'.join(element_types)}>" if element_types else "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__ # str, int, float, bool, datetime, ObjectId, Decimal128, ...
+
+def _flatten(document, prefix=""):
+    """Yields (dotted path, value) for every field, descending into embedded documents (not into arrays)."""
+    for key, value in document.items():
+        path = f"{prefix}{key}"
+        yield path, value
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{path}.")
+
+def _hashable(value):
+    return value if isinstance(value, (str, int, float, bool, type(None))) else repr(value)
+
+def estimate_cardinality(value_counts, total_documents):
+    """
+    Chao1 estimate of distinct values in the whole collection from the sample's value frequencies:
+    values seen once (f1) and twice (f2) hint at how many were never sampled. Capped at total_documents.
+    """
+    distinct = len(value_counts)
+    singletons = sum(1 for count in value_counts.values() if count == 1)
+    doubletons = sum(1 for count in value_counts.values() if count == 2)
+    if doubletons:
+        estimate = distinct + singletons ** 2 / (2 * doubletons)
+    else:
+        estimate = distinct + singletons * (singletons - 1) / 2
+    return int(min(estimate, total_documents)) if total_documents else distinct
+
+def profile_fields(documents, total_documents=None):
+    """
+    One row per field path seen in `documents`: presence (% of sampled documents), type
+    distribution, distinct values in the sample and an estimated collection-wide cardinality.
+    """
+    columns = ["field", "presence_pct", "types", "distinct_in_sample", "estimated_cardinality"]
+    if not documents:
+        return pd.DataFrame(columns=columns)
+    presence, types, values = Counter(), {}, {}
+    for document in documents:
+        for path, value in _flatten(document):
+            presence[path] += 1
+            types.setdefault(path, Counter())[_type_name(value)] += 1
+            if not isinstance(value, dict):
+                values.setdefault(path, Counter())[_hashable(value)] += 1
+
+    rows = []
+    for path, present in presence.items():
+        type_counts = types[path]
+        value_counts = values.get(path, Counter())
+        rows.append({
+            "field": path,
+            "presence_pct": 100.0 * present / len(documents),
+            "types": ", ".join(f"{name} {100.0 * count / present:.0f}%" for name, count in type_counts.most_common()),
+            "distinct_in_sample": len(value_counts),
+            "estimated_cardinality": estimate_cardinality(value_counts, total_documents or len(documents)) if value_counts else None,
+        })
+    return pd.DataFrame(rows, columns=columns).astype({"estimated_cardinality": "Int64"})
+
+def collection_storage_stats(collection):
+    """size, storageSize, avgObjSize and index sizes via $collStats, falling back to the collStats command."""
+    try:
+        stats = next(collection.aggregate([{"$collStats": {"storageStats": {}}}]), {}).get("storageStats", {})
+    except OperationFailure:
+        stats = collection.database.command("collStats", collection.name)
+    summary = {field: stats.get(field) for field in STORAGE_STAT_FIELDS}
+    summary["indexSizes"] = dict(stats.get("indexSizes", {}))
+    return summary
+
+def profile_collection(collection, sample_size=DEFAULT_SAMPLE_SIZE):
+    """Samples `sample_size` documents with $sample and gathers storage stats and indexes for one collection."""
+    storage_stats = collection_storage_stats(collection)
+    documents = list(collection.aggregate([{"$sample": {"size": int(sample_size)}}]))
+    indexes = [
+        {"name": index_spec["name"], "key": dict(index_spec["key"]), "unique": index_spec.get("unique", False),
+         "size_bytes": storage_stats["indexSizes"].get(index_spec["name"])}
+        for index_spec in collection.list_indexes()
+    ]
+    return {
+        "sampled_documents": len(documents),
+        "sample_size": int(sample_size),
+        "storage_stats": storage_stats,
+        "fields": profile_fields(documents, storage_stats.get("count")),
+        "indexes": pd.DataFrame(indexes, columns=["name", "key", "unique", "size_bytes"]),
+        "profiled_at": time.time(),
+    }
+
+class SchemaProfileCache:
+    """
+    Collection profiles and database collection lists, each kept for `ttl_s` seconds.
+    A cached profile is reused while it is fresh and was sampled with the same sample size;
+    invalidate() drops entries for a database (or a single collection) on demand.
+    """
+    def __init__(self, ttl_s=DEFAULT_TTL_S):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._collection_names = {}
+
+    def _fresh(self, cached_at):
+        return time.time() - cached_at < self.ttl_s
+
+    def collection_names(self, database):
+        with self._lock:
+            cached = self._collection_names.get(database.name)
+        if cached is not None and self._fresh(cached[0]):
+            return cached[1]
+        names = sorted(database.list_collection_names())
+        with self._lock:
+            self._collection_names[database.name] = (time.time(), names)
+        return names
+
+    def get(self, collection, sample_size=DEFAULT_SAMPLE_SIZE):
+        """Returns (profile, from_cache)."""
+        key = (collection.database.name, collection.name)
+        with self._lock:
+            cached = self._profiles.get(key)
+        if cached is not None and self._fresh(cached["profiled_at"]) and cached["sample_size"] == int(sample_size):
+            return cached, True
+        profile = profile_collection(collection, sample_size)
+        with self._lock:
+            self._profiles[key] = profile
+        return profile, False
+
+    def invalidate(self, db_name, collection_name=None):
+        with self._lock:
+            if collection_name is None:
+                self._collection_names.pop(db_name, None)
+                self._profiles = {key: profile for key, profile in self._profiles.items() if key[0] != db_name}
+            else:
+                self._profiles.pop((db_name, collection_name), None)
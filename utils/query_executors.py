@@ -0,0 +1,308 @@
+# utils/query_executors.py
+# Query executors shared by the Streamlit app (app.py) and the headless benchmark CLI
+# (utils/benchmark_cli.py). Nothing here touches the UI: errors are raised to the caller.
+import time
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pandas as pd
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from utils.cassandra_utils import ANALYTICS_PROFILE, prepare_cached
+from utils.cassandra_rollup import fetch_daily_rollup, fetch_rollup_performance, rollup_table_exists
+from utils.cassandra_server_aggregation import aggregation_table_exists, fetch_server_aggregates
+from utils.dataset_bounds import to_python_date
+from utils.token_range_scanner import scan_token_ranges
+
+PERFORMANCE_COLUMNS = ['id_karyawan', 'total_sales', 'transactions_handled']
+# Documents stay undecoded BSON bytes until documents_to_dataframe (cursor_options raw_bson=True)
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+# Encoded width of fixed-size CQL values (DATE, INT, BIGINT); TEXT values are measured
+CQL_FIXED_WIDTHS = {'tanggal': 4, 'total_transaksi': 4, 'total_sales': 8, 'transactions_handled': 8}
+
+# ----------------- Cassandra -----------------
+def run_cassandra_query(session, cql_query: str, use_prepared: bool = False):
+    """
+    Executes a CQL query and returns (DataFrame, seconds). Preparing happens
+    (once per query text) before the timer, so only execution is measured.
+    """
+    statement = prepare_cached(session, cql_query) if use_prepared else str(cql_query)
+    start_time = time.perf_counter()
+    rows = session.execute(statement)
+    duration = time.perf_counter() - start_time
+    return pd.DataFrame(list(rows)), duration
+
+def cassandra_query_operation(session, cql_query: str, use_prepared: bool = False):
+    """Zero-argument callable that runs the query and drains every page, for repeated runs and load tests."""
+    if use_prepared:
+        return lambda: list(session.execute(prepare_cached(session, cql_query)))
+    return lambda: list(session.execute(str(cql_query)))
+
+# ----------------- MongoDB -----------------
+def _parse_json_option(text, name):
+    text = (text or "").strip()
+    if not text or text.lower() == "null":
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{name} must be valid JSON: {e}")
+
+def parse_cursor_options(projection="", sort="", limit=0, batch_size=0, hint="", raw_bson=False):
+    """
+    Turns the cursor knobs entered in the UI (JSON strings and numbers) into cursor_options
+    for the MongoDB executors. Unset knobs are left out, so the driver defaults apply.
+      * projection: {"field": 1, ...}   * sort: {"field": 1 | -1, ...} (key order kept)
+      * limit / batch_size: 0 = no limit / driver default
+      * hint: an index name, or its key spec as {"field": 1}
+      * raw_bson: keep documents as RawBSONDocument, so decoding happens after the timer
+    Raises ValueError for malformed input.
+    """
+    cursor_options = {}
+    projection_value = _parse_json_option(projection, "Projection")
+    if projection_value is not None:
+        if not isinstance(projection_value, dict): raise ValueError("Projection must be a JSON object.")
+        cursor_options["projection"] = projection_value
+    sort_value = _parse_json_option(sort, "Sort")
+    if sort_value:
+        if not isinstance(sort_value, dict): raise ValueError("Sort must be a JSON object such as {\"nama_karyawan\": 1}.")
+        cursor_options["sort"] = list(sort_value.items())
+    if int(limit or 0) > 0: cursor_options["limit"] = int(limit)
+    if int(batch_size or 0) > 0: cursor_options["batch_size"] = int(batch_size)
+    hint_text = (hint or "").strip()
+    if hint_text:
+        hint_value = _parse_json_option(hint_text, "Hint") if hint_text[0] in "{[" else hint_text
+        cursor_options["hint"] = list(hint_value.items()) if isinstance(hint_value, dict) else hint_value
+    if raw_bson: cursor_options["raw_bson"] = True
+    return cursor_options
+
+def run_mongodb_benchmark_operation(collection, operation_type: str, query_params, cursor_options=None):
+    """
+    Runs a benchmark operation ('Find', 'Aggregate', 'Count Documents') and returns the documents.
+    `cursor_options` (see parse_cursor_options) apply where the command supports them: all of them
+    for Find, batch_size and hint for Aggregate (project/sort/limit belong in the pipeline), and
+    limit and hint for Count Documents.
+    """
+    options = dict(cursor_options or {})
+    if options.pop("raw_bson", False):
+        collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+    if operation_type == 'Find':
+        if not isinstance(query_params, dict): raise ValueError("Filter for Find must be a JSON object.")
+        return list(collection.find(query_params, **options))
+    elif operation_type == 'Aggregate':
+        if not isinstance(query_params, list): raise ValueError("Pipeline for Aggregate must be a JSON array.")
+        aggregate_options = {key: options[key] for key in ("batch_size", "hint") if key in options}
+        if "batch_size" in aggregate_options: aggregate_options["batchSize"] = aggregate_options.pop("batch_size")
+        return list(collection.aggregate(query_params, **aggregate_options))
+    elif operation_type == 'Count Documents':
+        if not isinstance(query_params, dict): raise ValueError("Filter for Count Documents must be a JSON object.")
+        count_options = {key: options[key] for key in ("limit", "hint") if key in options}
+        return [{"count": collection.count_documents(query_params, **count_options)}]
+    raise ValueError(f"Unsupported benchmark operation: {operation_type}")
+
+def documents_to_dataframe(documents):
+    if documents and isinstance(documents[0], RawBSONDocument):
+        documents = [bson.decode(document.raw) for document in documents]
+    df = pd.DataFrame(documents)
+    if not df.empty and '_id' in df.columns:
+        if isinstance(df['_id'].iloc[0], ObjectId):
+            df['_id'] = df['_id'].astype(str)
+    return df
+
+def run_mongodb_query(db_connection, collection_name: str, operation_type: str, query_params, cursor_options=None):
+    """
+    Executes a benchmark operation on `collection_name` and returns (DataFrame, seconds).
+    With raw_bson in `cursor_options`, the seconds exclude BSON decoding (done while building the DataFrame).
+    """
+    collection = db_connection[collection_name]
+    start_time = time.perf_counter()
+    documents = run_mongodb_benchmark_operation(collection, operation_type, query_params, cursor_options)
+    duration = time.perf_counter() - start_time
+    return documents_to_dataframe(documents), duration
+
+def mongodb_query_operation(db_connection, collection_name: str, operation_type: str, query_params, cursor_options=None):
+    collection = db_connection[collection_name]
+    return lambda: run_mongodb_benchmark_operation(collection, operation_type, query_params, cursor_options)
+
+# ----------------- Combined Analytics -----------------
+def fetch_performance_from_rollup(session, start_date, end_date):
+    """Per-employee totals for [start_date, end_date] read from the daily rollup partitions."""
+    return fetch_rollup_performance(session, start_date, end_date)
+
+def estimate_payload_bytes(df):
+    """
+    Approximate size of `df` as a native-protocol result payload: a 4-byte length prefix per cell
+    plus the value (fixed widths for dates and numbers, UTF-8 length for text). Used to compare
+    how much data each aggregation path pulls over the network.
+    """
+    total_bytes = 4 * df.size
+    for column in df.columns:
+        if column in CQL_FIXED_WIDTHS:
+            total_bytes += CQL_FIXED_WIDTHS[column] * len(df)
+        else:
+            total_bytes += int(df[column].astype(str).str.len().sum())
+    return total_bytes
+
+def aggregate_transaction_pages(pages, group_columns, fold_every=20, transfer_stats=None):
+    """
+    Folds raw transaksi_harian driver pages into per-group total_sales / transactions_handled.
+    Each page is reduced with a pandas groupby as it arrives and the partial results are folded
+    into running totals every `fold_every` pages, so memory stays proportional to the number of
+    groups (employees, or days x employees), not to the number of transactions scanned.
+    With a `transfer_stats` dict, the raw rows and estimated bytes received are added to it.
+    """
+    running, partials = None, []
+
+    def fold(running, partials):
+        combined = pd.concat(([running] if running is not None else []) + partials)
+        return combined.groupby(level=group_columns).sum()
+
+    for page in pages:
+        df_page = pd.DataFrame(page)
+        if df_page.empty:
+            continue
+        if transfer_stats is not None:
+            transfer_stats["rows"] = transfer_stats.get("rows", 0) + len(df_page)
+            transfer_stats["bytes"] = transfer_stats.get("bytes", 0) + estimate_payload_bytes(df_page)
+        if 'tanggal' in group_columns:
+            df_page['tanggal'] = df_page['tanggal'].map(to_python_date)
+        partials.append(df_page.groupby(group_columns).agg(
+            total_sales=('total_transaksi', 'sum'),
+            transactions_handled=('id_transaksi', 'count') # Using count of transactions as proxy
+        ))
+        if len(partials) >= fold_every:
+            running, partials = fold(running, partials), []
+    if partials:
+        running = fold(running, partials)
+    if running is None:
+        return pd.DataFrame(columns=group_columns + ['total_sales', 'transactions_handled'])
+    return running.reset_index()
+
+def _scan_transaction_pages(session, columns, start_date, end_date, execution_profile, fetch_size):
+    # Token-range parallel ALLOW FILTERING scan; pages are yielded as the driver fetches them
+    return scan_token_ranges(
+        session, "transaksi_harian", columns,
+        where="tanggal >= ? AND tanggal <= ?", where_params=(start_date, end_date), allow_filtering=True,
+        execution_profile=execution_profile, fetch_size=fetch_size
+    )
+
+def fetch_performance_from_scan(session, start_date, end_date, execution_profile=ANALYTICS_PROFILE, fetch_size=5000,
+                                transfer_stats=None):
+    """
+    Per-employee totals computed client-side from raw transaksi_harian rows, aggregated page by
+    page while the token-range scan is still running (no raw result set is ever materialized).
+    """
+    pages = _scan_transaction_pages(session, ["id_karyawan", "total_transaksi", "id_transaksi"],
+                                    start_date, end_date, execution_profile, fetch_size)
+    return aggregate_transaction_pages(pages, ['id_karyawan'], transfer_stats=transfer_stats)
+
+def fetch_performance_from_server(session, start_date, end_date, transfer_stats=None):
+    """
+    Per-employee totals computed by Cassandra: one GROUP BY query per day partition of the
+    aggregation table, so only (day, branch, employee) sums are transferred. The few remaining
+    rows are summed per employee here.
+    """
+    df_groups = fetch_server_aggregates(session, start_date, end_date)
+    if transfer_stats is not None:
+        transfer_stats["rows"] = transfer_stats.get("rows", 0) + len(df_groups)
+        transfer_stats["bytes"] = transfer_stats.get("bytes", 0) + estimate_payload_bytes(df_groups)
+    if df_groups.empty:
+        return pd.DataFrame(columns=PERFORMANCE_COLUMNS)
+    return df_groups.groupby('id_karyawan')[['total_sales', 'transactions_handled']].sum().reset_index()
+
+def fetch_daily_performance_from_rollup(session, start_date, end_date):
+    """Per-day, per-employee totals for [start_date, end_date] (tanggal as datetime.date), from the rollup."""
+    df_days = fetch_daily_rollup(session, start_date, end_date)
+    df_days['tanggal'] = df_days['tanggal'].map(to_python_date)
+    return df_days
+
+def fetch_daily_performance_from_scan(session, start_date, end_date, execution_profile=ANALYTICS_PROFILE, fetch_size=5000):
+    """Same shape as fetch_daily_performance_from_rollup, aggregated page by page from a raw-row scan."""
+    pages = _scan_transaction_pages(session, ["tanggal", "id_karyawan", "total_transaksi", "id_transaksi"],
+                                    start_date, end_date, execution_profile, fetch_size)
+    return aggregate_transaction_pages(pages, ['tanggal', 'id_karyawan'])
+
+def fetch_daily_performance_from_server(session, start_date, end_date):
+    """Same shape as fetch_daily_performance_from_rollup, aggregated server-side with GROUP BY."""
+    df_groups = fetch_server_aggregates(session, start_date, end_date)
+    if df_groups.empty:
+        return pd.DataFrame(columns=['tanggal'] + PERFORMANCE_COLUMNS)
+    df_groups['tanggal'] = df_groups['tanggal'].map(to_python_date)
+    return df_groups.groupby(['tanggal', 'id_karyawan'])[['total_sales', 'transactions_handled']].sum().reset_index()
+
+def fetch_employee_performance(session, start_date, end_date):
+    """
+    Returns (DataFrame, source), using the cheapest path available: the rollup table, then
+    server-side GROUP BY on the aggregation table, otherwise the raw-row scan.
+    """
+    if rollup_table_exists(session):
+        return fetch_performance_from_rollup(session, start_date, end_date), "rollup"
+    if aggregation_table_exists(session):
+        return fetch_performance_from_server(session, start_date, end_date), "server_group_by"
+    return fetch_performance_from_scan(session, start_date, end_date), "scan"
+
+def compare_aggregation_paths(session, start_date, end_date):
+    """
+    Runs the server-side GROUP BY path and the raw-row scan path for the same range and reports,
+    per path: seconds, rows transferred and estimated bytes transferred. Also checks that both
+    paths agree on the totals. Returns (comparison DataFrame, totals_match).
+    """
+    paths = {"Server-side GROUP BY": fetch_performance_from_server, "Client-side raw-row scan": fetch_performance_from_scan}
+    comparison, results = [], {}
+    for path_name, fetch_path in paths.items():
+        transfer_stats = {"rows": 0, "bytes": 0}
+        results[path_name], seconds = _timed_call(lambda: fetch_path(session, start_date, end_date, transfer_stats=transfer_stats))
+        comparison.append({"Path": path_name, "Seconds": seconds, "Rows transferred": transfer_stats["rows"],
+                           "Estimated bytes": transfer_stats["bytes"]})
+    server_df, scan_df = (results[path_name].set_index('id_karyawan').sort_index().astype('int64') for path_name in paths)
+    return pd.DataFrame(comparison), server_df.equals(scan_df)
+
+def fetch_employee_details(mongo_db_conn, employee_ids_list):
+    """Name and jabatan for the given id_karyawan values from the `karyawan` collection."""
+    employees = list(mongo_db_conn["karyawan"].find(
+        {"id_karyawan": {"$in": employee_ids_list}},
+        {"_id": 0, "id_karyawan": 1, "nama_karyawan": 1, "jabatan": 1}
+    ))
+    return pd.DataFrame(employees)
+
+def combine_performance_with_details(performance_df, details_df):
+    if details_df.empty:
+        return performance_df
+    combined_df = pd.merge(performance_df, details_df, on="id_karyawan", how="left")
+    combined_df.fillna({"nama_karyawan": "N/A", "jabatan": "N/A"}, inplace=True)
+    return combined_df
+
+def _timed_call(function):
+    start_time = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start_time
+
+def fetch_combined_performance(fetch_performance, employee_dimension):
+    """
+    Overlaps the two stores: employee_dimension.refresh() (the full `karyawan` load on first
+    use, an incremental refresh afterwards) runs on a worker thread while fetch_performance()
+    reads Cassandra on the calling thread, so the wait is roughly max(cassandra, mongodb)
+    instead of the sum. The in-memory join runs once both are done.
+    Returns (combined DataFrame, per-stage seconds).
+    """
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics-mongodb") as executor:
+        dimension_future = executor.submit(_timed_call, employee_dimension.refresh)
+        performance_df, cassandra_s = _timed_call(fetch_performance)
+        _, mongodb_s = dimension_future.result()
+
+    join_start = time.perf_counter()
+    combined_df = performance_df
+    if not performance_df.empty and 'id_karyawan' in performance_df.columns:
+        details_df = employee_dimension.lookup(performance_df['id_karyawan'].unique().tolist())
+        combined_df = combine_performance_with_details(performance_df, details_df)
+    join_s = time.perf_counter() - join_start
+
+    timings = {
+        "Cassandra performance fetch": cassandra_s,
+        "MongoDB employee dimension": mongodb_s,
+        "Join": join_s,
+        "Total (end to end)": time.perf_counter() - start_time,
+    }
+    return combined_df, timings
@@ -0,0 +1,123 @@
+# utils/streaming_ingest.py
+# Chunked, resumable ingestion: a reader thread pulls chunks from the source into a small
+# bounded buffer, each chunk is written to every sink (table/collection) concurrently, and
+# the number of rows fully written is checkpointed to a JSON file after every chunk.
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+DEFAULT_CHECKPOINT_PATH = "ingest_checkpoint.json"
+_SOURCE_DONE = object()
+
+# ----------------- Checkpoints -----------------
+def load_checkpoints(checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """All checkpoints in the file as {table: {"rows_done": int, "updated_at": str}}."""
+    if not os.path.exists(checkpoint_path):
+        return {}
+    with open(checkpoint_path) as checkpoint_file:
+        return json.load(checkpoint_file)
+
+def checkpoint_offset(table, checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """Rows of `table` already written to every sink (0 when there is no checkpoint)."""
+    return load_checkpoints(checkpoint_path).get(table, {}).get("rows_done", 0)
+
+def _write_checkpoints(checkpoints, checkpoint_path):
+    # Written to a temp file then renamed, so a crash mid-write never leaves a corrupt checkpoint
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, "w") as checkpoint_file:
+        json.dump(checkpoints, checkpoint_file, indent=2)
+    os.replace(temp_path, checkpoint_path)
+
+def save_checkpoint(table, rows_done, checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    checkpoints = load_checkpoints(checkpoint_path)
+    checkpoints[table] = {"rows_done": int(rows_done), "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+    _write_checkpoints(checkpoints, checkpoint_path)
+
+def clear_checkpoint(table, checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """Forgets `table`'s progress, so the next run starts from row 0."""
+    checkpoints = load_checkpoints(checkpoint_path)
+    if checkpoints.pop(table, None) is not None:
+        _write_checkpoints(checkpoints, checkpoint_path)
+
+# ----------------- Pipeline -----------------
+def prefetch_chunks(chunks, max_buffered=2):
+    """
+    Reads `chunks` on a background thread while the caller writes the previous one. At most
+    `max_buffered` chunks wait in memory: the reader blocks when the buffer is full (backpressure).
+    """
+    buffer, stop_event = queue.Queue(maxsize=max_buffered), threading.Event()
+
+    def reader():
+        try:
+            for chunk in chunks:
+                while not stop_event.is_set():
+                    try:
+                        buffer.put(chunk, timeout=0.5); break
+                    except queue.Full:
+                        continue
+                if stop_event.is_set(): return
+            buffer.put(_SOURCE_DONE)
+        except Exception as e:
+            buffer.put(e)
+
+    reader_thread = threading.Thread(target=reader, name="ingest-reader", daemon=True)
+    reader_thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _SOURCE_DONE: return
+            if isinstance(item, Exception): raise item
+            yield item
+    finally:
+        stop_event.set()
+
+def limit_rows(chunks, max_rows):
+    """Passes chunks through until `max_rows` rows have been yielded, trimming the last one."""
+    remaining = max_rows
+    for chunk in chunks:
+        if remaining <= 0: return
+        yield chunk.iloc[:remaining]
+        remaining -= len(chunk)
+
+def stream_ingest(table, chunks, sinks, start_row=0, total_rows=None, after_chunk=None, max_buffered=2,
+                  checkpoint_path=DEFAULT_CHECKPOINT_PATH, progress_callback=None):
+    """
+    Writes every chunk from `chunks` (DataFrames starting at row `start_row` of the source) to all
+    `sinks` concurrently. `sinks` maps a sink name to a callable(df_chunk) returning
+    (failed_count, detail, first_error), like the cassandra_ingest / mongo_ingest chunk writers.
+
+    A chunk counts as done only when every sink wrote it without failures; `after_chunk(df_chunk)`
+    then runs (e.g. rollup/bounds maintenance) and the checkpoint advances. On a failure the
+    checkpoint stays at the last completed chunk and RuntimeError is raised, so a rerun
+    resumes from there. Returns the final progress dict.
+    """
+    progress = {"table": table, "rows_done": start_row, "total_rows": total_rows, "rows_this_run": 0,
+                "elapsed_s": 0.0, "rows_per_s": 0.0, "chunks": 0}
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(sinks), thread_name_prefix=f"ingest-{table}") as executor:
+        for df_chunk in prefetch_chunks(chunks, max_buffered):
+            futures = {name: executor.submit(sink, df_chunk) for name, sink in sinks.items()}
+            failures = []
+            for name, future in futures.items():
+                failed_count, _, first_error = future.result()
+                if failed_count:
+                    failures.append(f"{name}: {failed_count} rows failed ({first_error})")
+            if failures:
+                raise RuntimeError(f"Chunk at row {progress['rows_done']} of '{table}' failed; "
+                                   f"checkpoint kept at {progress['rows_done']}. " + "; ".join(failures))
+            if after_chunk is not None:
+                after_chunk(df_chunk)
+
+            progress["rows_done"] += len(df_chunk)
+            progress["rows_this_run"] += len(df_chunk)
+            progress["chunks"] += 1
+            save_checkpoint(table, progress["rows_done"], checkpoint_path)
+            progress["elapsed_s"] = time.perf_counter() - start_time
+            progress["rows_per_s"] = progress["rows_this_run"] / progress["elapsed_s"] if progress["elapsed_s"] > 0 else 0.0
+            if progress_callback is not None:
+                progress_callback(dict(progress))
+    return progress
@@ -0,0 +1,106 @@
+# utils/token_range_scanner.py
+import queue
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from cassandra.cluster import EXEC_PROFILE_DEFAULT
+from utils.cassandra_utils import bind_cached
+
+# Murmur3Partitioner token ring bounds (Cassandra's default partitioner)
+MIN_TOKEN = -2**63
+MAX_TOKEN = 2**63 - 1
+
+_RANGE_DONE = object() # Sentinel a worker puts on the queue once its token range is exhausted
+
+def split_token_ring(num_splits):
+    """
+    Splits the Murmur3 token ring into `num_splits` contiguous (start, end] ranges.
+    The first range starts at MIN_TOKEN and the last one ends at MAX_TOKEN,
+    so together the ranges cover every partition exactly once.
+    """
+    if num_splits < 1:
+        raise ValueError("num_splits must be at least 1.")
+    ring_size = MAX_TOKEN - MIN_TOKEN
+    boundaries = [MIN_TOKEN + (ring_size * i) // num_splits for i in range(num_splits)] + [MAX_TOKEN]
+    ranges = [(boundaries[i], boundaries[i + 1]) for i in range(num_splits)]
+    return ranges
+
+def get_partition_key_columns(session, table, keyspace=None):
+    """Reads the partition key column names of a table from the driver's schema metadata."""
+    keyspace = keyspace or session.keyspace
+    keyspace_meta = session.cluster.metadata.keyspaces.get(keyspace)
+    if keyspace_meta is None or table not in keyspace_meta.tables:
+        raise ValueError(f"Table '{keyspace}.{table}' not found in cluster metadata.")
+    return [column.name for column in keyspace_meta.tables[table].partition_key]
+
+def build_token_range_query(table, columns, partition_key, where=None, allow_filtering=False):
+    """
+    Builds the per-range CQL. The first range uses `>=` so MIN_TOKEN itself is included.
+    Extra `where` predicates use `?` markers and are bound after the two token bounds.
+    """
+    token_expr = f"token({', '.join(partition_key)})"
+    select_list = ', '.join(columns)
+    range_cql = f"SELECT {select_list} FROM {table} WHERE {token_expr} > ? AND {token_expr} <= ?"
+    first_range_cql = f"SELECT {select_list} FROM {table} WHERE {token_expr} >= ? AND {token_expr} <= ?"
+    suffix = (f" AND {where}" if where else "") + (" ALLOW FILTERING" if allow_filtering else "")
+    return first_range_cql + suffix, range_cql + suffix
+
+def scan_token_ranges(session, table, columns, partition_key=None, where=None, where_params=(),
+                      allow_filtering=False, num_splits=None, concurrency=8, fetch_size=5000,
+                      execution_profile=EXEC_PROFILE_DEFAULT):
+    """
+    Reads a whole table (or the rows matching `where`) by issuing one query per token
+    sub-range, with at most `concurrency` ranges in flight. Yields driver pages
+    (lists of rows) as soon as any range produces them; pages are not ordered.
+
+    A bounded queue between the workers and the consumer keeps memory at roughly
+    `2 * concurrency` pages regardless of table size.
+    """
+    partition_key = partition_key or get_partition_key_columns(session, table)
+    num_splits = num_splits or concurrency * 4
+    first_range_cql, range_cql = build_token_range_query(table, columns, partition_key, where, allow_filtering)
+
+    token_ranges = split_token_ring(num_splits)
+    page_queue = queue.Queue(maxsize=concurrency * 2)
+    stop_event = threading.Event()
+
+    def scan_range(range_index, start_token, end_token):
+        try:
+            range_query = first_range_cql if range_index == 0 else range_cql
+            bound = bind_cached(session, range_query, (start_token, end_token) + tuple(where_params), fetch_size=fetch_size)
+            result = session.execute(bound, execution_profile=execution_profile)
+            while not stop_event.is_set():
+                if result.current_rows:
+                    page_queue.put(list(result.current_rows))
+                if not result.has_more_pages:
+                    break
+                result.fetch_next_page()
+            page_queue.put(_RANGE_DONE)
+        except Exception as e:
+            page_queue.put(e)
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="token-range-scan")
+    try:
+        for range_index, (start_token, end_token) in enumerate(token_ranges):
+            executor.submit(scan_range, range_index, start_token, end_token)
+        ranges_remaining = len(token_ranges)
+        while ranges_remaining:
+            item = page_queue.get()
+            if item is _RANGE_DONE:
+                ranges_remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        # Unblock any worker still waiting on a full queue before shutting down
+        stop_event.set()
+        while True:
+            try: page_queue.get_nowait()
+            except queue.Empty: break
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def scan_token_ranges_as_dataframes(session, table, columns, **scan_kwargs):
+    """Same as scan_token_ranges, but yields each page as a pandas DataFrame chunk."""
+    for page in scan_token_ranges(session, table, columns, **scan_kwargs):
+        yield pd.DataFrame(page)